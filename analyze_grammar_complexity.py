@@ -0,0 +1,41 @@
+import argparse
+import json
+import sys
+
+from llm_function_calling.llm_function_calling import gpt_functions
+from llm_function_calling.llm_function_calling.function_calling_grammar_generator import generate_gbnf_grammar, \
+    append_primitive_grammar
+from llm_function_calling.llm_function_calling.grammar_analyzer import analyze_grammar
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report the complexity of a GBNF function calling grammar.")
+    parser.add_argument("grammar_file", nargs="?",
+                        help="Path of the .gbnf file to analyze. Analyzes the example functions if omitted.")
+    parser.add_argument("--top", type=int, default=5, help="Number of largest enums to list.")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args(argv)
+
+    if args.grammar_file:
+        with open(args.grammar_file, 'r', encoding='utf-8') as file:
+            grammar = file.read()
+    else:
+        function_calls = [gpt_functions.send_message, gpt_functions.core_memory_append,
+                          gpt_functions.core_memory_replace, gpt_functions.archival_memory_insert,
+                          gpt_functions.archival_memory_search, gpt_functions.recall_memory_search,
+                          gpt_functions.cmd_command, gpt_functions.web_browsing, gpt_functions.web_download,
+                          gpt_functions.read_file, gpt_functions.write_file,
+                          gpt_functions.python_interpreter_command, gpt_functions.create_user_profile,
+                          gpt_functions.create_order]
+        grammar = append_primitive_grammar(generate_gbnf_grammar(function_calls))
+
+    report = analyze_grammar(grammar, top_n=args.top)
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print(report.format())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
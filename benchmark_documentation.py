@@ -0,0 +1,69 @@
+import time
+
+from llm_function_calling.llm_function_calling import gpt_functions
+from llm_function_calling.llm_function_calling.function_call import DataType, FunctionCall, FunctionParameters, \
+    FunctionParameter
+from llm_function_calling.llm_function_calling.function_calling_grammar_generator import generate_documentation, \
+    generate_compact_documentation
+from llm_function_calling.llm_function_calling.grammar_cache import DocumentationCache, fingerprint_function_calls
+
+REPEATS = 200
+
+
+def build_example_toolset():
+    """The example functions of gpt_functions.py plus two functions that reuse its address structure."""
+    update_address = FunctionCall("update_address", "Update the address of an existing user", FunctionParameters({
+        "username": FunctionParameter(DataType.STRING, True, "User's unique username"),
+        "address": FunctionParameter(DataType.OBJECT, True, "User's new physical address",
+                                     structure=gpt_functions.address_structure),
+    }))
+    ship_order = FunctionCall("ship_order", "Ship an order to one or more addresses", FunctionParameters({
+        "order_id": FunctionParameter(DataType.STRING, True, "Identifier of the order"),
+        "destinations": FunctionParameter(DataType.ARRAY, True, "Addresses to ship to",
+                                          element_type=FunctionParameter(DataType.OBJECT, True,
+                                                                         structure=gpt_functions.address_structure)),
+        "gift_note": FunctionParameter(DataType.STRING, False, "Optional note printed on the packing slip"),
+    }))
+    return [gpt_functions.send_message, gpt_functions.core_memory_append, gpt_functions.core_memory_replace,
+            gpt_functions.archival_memory_insert, gpt_functions.archival_memory_search,
+            gpt_functions.recall_memory_search, gpt_functions.cmd_command, gpt_functions.web_browsing,
+            gpt_functions.web_download, gpt_functions.read_file, gpt_functions.write_file,
+            gpt_functions.python_interpreter_command, gpt_functions.create_user_profile,
+            gpt_functions.create_order, update_address, ship_order]
+
+
+def time_render(render):
+    best = None
+    documentation = ""
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        documentation = render()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, documentation
+
+
+def run_benchmark():
+    function_calls = build_example_toolset()
+    full_length = len(generate_documentation(function_calls))
+    frozen = [function_call.freeze() for function_call in function_calls]
+    cache = DocumentationCache()
+    fingerprint = fingerprint_function_calls(function_calls)
+    cache.get_documentation(function_calls, fingerprint=fingerprint)
+    cache.get_documentation(frozen)
+    modes = [
+        ("full", lambda: generate_documentation(function_calls)),
+        ("compact", lambda: generate_compact_documentation(function_calls)),
+        ("compact <= 60%", lambda: generate_compact_documentation(function_calls, max_length=int(full_length * 0.6))),
+        ("cached, fp", lambda: cache.get_documentation(function_calls, fingerprint=fingerprint)),
+        ("cached, frozen", lambda: cache.get_documentation(frozen)),
+    ]
+    print(f"{'mode':>16} {'chars':>7} {'~tokens':>8} {'vs full':>8} {'render us':>10}")
+    for mode, render in modes:
+        seconds, documentation = time_render(render)
+        print(f"{mode:>16} {len(documentation):>7} {len(documentation) // 4:>8} "
+              f"{len(documentation) / full_length:>8.0%} {seconds * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
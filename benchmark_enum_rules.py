@@ -0,0 +1,73 @@
+import time
+
+from llm_function_calling.llm_function_calling.function_call import DataType, FunctionCall, FunctionParameters, \
+    FunctionParameter
+from llm_function_calling.llm_function_calling.function_calling_grammar_generator import generate_gbnf_grammar
+
+ENUM_SIZES = [10, 100, 1000, 10000]
+REPEATS = 3
+
+
+def build_sku_values(count):
+    """SKU-like values that share long prefixes, e.g. 'ELEC-TV-000042'."""
+    departments = ["ELEC-TV", "ELEC-PHONE", "HOME-KITCHEN", "HOME-GARDEN", "BOOK-FICTION"]
+    return [f"{departments[i % len(departments)]}-{i:06d}" for i in range(count)]
+
+
+def build_function_call(enum_values):
+    return FunctionCall("lookup_product", "Looks up a product by SKU", FunctionParameters({
+        "sku": FunctionParameter(DataType.ENUM, True, "The product SKU", enum=enum_values),
+    }))
+
+
+def top_level_alternatives(rule_body):
+    """Count the alternatives of a rule body outside of parentheses, i.e. the stacks started by the rule."""
+    depth = 0
+    count = 1
+    in_literal = False
+    escaped = False
+    for char in rule_body:
+        if in_literal:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_literal = False
+        elif char == '"':
+            in_literal = True
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            count += 1
+    return count
+
+
+def measure(function_calls, enum_trie_threshold):
+    best = None
+    grammar = ""
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        grammar = generate_gbnf_grammar(function_calls, enum_trie_threshold=enum_trie_threshold)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    rules = [line for line in grammar.split("\n") if "::=" in line]
+    enum_rule = next(line for line in rules if line.startswith("lookup-product-sku ::="))
+    groups = grammar.count("(")
+    return best, len(grammar), len(rules), groups, top_level_alternatives(enum_rule.split("::=", 1)[1])
+
+
+def run_benchmark():
+    print(f"{'values':>8} {'mode':>5} {'seconds':>9} {'grammar bytes':>14} {'rules':>6} {'groups':>7} "
+          f"{'top-level alternatives':>24}")
+    for size in ENUM_SIZES:
+        function_calls = [build_function_call(build_sku_values(size))]
+        for mode, threshold in (("flat", None), ("trie", 1)):
+            seconds, size_bytes, rule_count, groups, alternatives = measure(function_calls, threshold)
+            print(f"{size:>8} {mode:>5} {seconds:>9.4f} {size_bytes:>14} {rule_count:>6} {groups:>7} {alternatives:>24}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,63 @@
+import random
+import time
+
+from llm_function_calling.llm_function_calling.function_call import DataType, FunctionCall, FunctionParameters, \
+    FunctionParameter
+from llm_function_calling.llm_function_calling.function_calling_grammar_generator import generate_gbnf_grammar, \
+    append_primitive_grammar
+from llm_function_calling.llm_function_calling.function_registry import FunctionRegistry
+from llm_function_calling.llm_function_calling.grammar_cache import GrammarCache
+
+TOOL_COUNTS = [14, 500, 3000]
+REPEATS = 20
+
+TOPICS = ("account address booking calendar customer document email event file flight invoice meeting "
+          "message order payment product profile report shipment task ticket user weather").split()
+VERBS = "create get list update delete search send cancel".split()
+
+
+def build_function_calls(count, rng):
+    function_calls = []
+    for i in range(count):
+        verb, topic = rng.choice(VERBS), rng.choice(TOPICS)
+        function_calls.append(FunctionCall(f"{verb}_{topic}_{i}", f"{verb.capitalize()} a {topic}.",
+                                           FunctionParameters({
+            f"{topic}_id": FunctionParameter(DataType.STRING, True, f"Identifier of the {topic}."),
+            "mode": FunctionParameter(DataType.ENUM, False, "How thorough to be.", enum=["fast", "full"]),
+            "limit": FunctionParameter(DataType.NUMBER, False, "Maximum number of results."),
+        })))
+    return function_calls
+
+
+def best_time(function, repeats=REPEATS):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_benchmark():
+    rng = random.Random(0)
+    print(f"{'tools':>6} {'generate us':>12} {'hit list us':>12} {'hit frozen us':>14} {'hit registry us':>16}")
+    for count in TOOL_COUNTS:
+        function_calls = build_function_calls(count, rng)
+        frozen = [function_call.freeze() for function_call in function_calls]
+        registry = FunctionRegistry()
+        for function_call in function_calls:
+            registry.register(function_call)
+
+        generate = best_time(lambda: append_primitive_grammar(generate_gbnf_grammar(function_calls)), 3)
+        hits = []
+        for toolset in (function_calls, frozen, registry):
+            cache = GrammarCache()
+            cache.get_grammar(toolset)
+            hits.append(best_time(lambda: cache.get_grammar(toolset)))
+        print(f"{count:>6} {generate * 1e6:>12.1f} {hits[0] * 1e6:>12.1f} {hits[1] * 1e6:>14.1f} "
+              f"{hits[2] * 1e6:>16.1f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
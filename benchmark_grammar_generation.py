@@ -0,0 +1,81 @@
+import time
+
+from llm_function_calling.llm_function_calling.function_call import DataType, FunctionCall, FunctionParameters, \
+    FunctionParameter
+from llm_function_calling.llm_function_calling.function_calling_grammar_generator import generate_gbnf_grammar
+
+FUNCTION_COUNTS = [10, 100, 1000, 10000]
+NESTING_DEPTHS = [0, 1, 3]
+WIDTHS = [1000, 10000, 100000]
+REPEATS = 3
+
+
+def build_structure(depth):
+    """Build a nested object structure with an enum, a float array and another object per level."""
+    structure = {
+        "name": FunctionParameter(DataType.STRING, True, "Name of the entry"),
+        "kind": FunctionParameter(DataType.ENUM, True, "Kind of the entry", enum=["Small", "Medium", "Large"]),
+        "values": FunctionParameter(DataType.ARRAY, True, "Measured values",
+                                    element_type=FunctionParameter(DataType.FLOAT, True, precision=3)),
+    }
+    if depth > 1:
+        structure["child"] = FunctionParameter(DataType.OBJECT, True, "Nested entry", structure=build_structure(depth - 1))
+    return structure
+
+
+def build_function_calls(count, depth):
+    function_calls = []
+    for i in range(count):
+        properties = {
+            "inner_thoughts": FunctionParameter(DataType.STRING, True, "Your inner thoughts."),
+            "mode": FunctionParameter(DataType.ENUM, True, "Processing mode", enum=["Fast", "Exact", "Custom"]),
+            "require_heartbeat": FunctionParameter(DataType.BOOLEAN, True, "Get control back after execution."),
+        }
+        if depth > 0:
+            properties["entry"] = FunctionParameter(DataType.OBJECT, True, "Entry to process",
+                                                    structure=build_structure(depth))
+            properties["entries"] = FunctionParameter(DataType.ARRAY, True, "Entries to process",
+                                                      element_type=FunctionParameter(DataType.OBJECT, True,
+                                                                                     structure=build_structure(depth)))
+        function_calls.append(FunctionCall(f"function_{i}", f"Benchmark function {i}", FunctionParameters(properties)))
+    return function_calls
+
+
+def build_wide_function_call(width):
+    """Build a single function with an object of width fields and an enum of width values."""
+    structure = {f"field_{i}": FunctionParameter(DataType.STRING, True) for i in range(width)}
+    return FunctionCall("wide_function", "Benchmark function with a wide object and a large enum", FunctionParameters({
+        "record": FunctionParameter(DataType.OBJECT, True, "Wide record", structure=structure),
+        "code": FunctionParameter(DataType.ENUM, True, "Large enum", enum=[f"CODE-{i}" for i in range(width)]),
+    }))
+
+
+def time_generation(function_calls, **grammar_options):
+    best = None
+    grammar = ""
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        grammar = generate_gbnf_grammar(function_calls, **grammar_options)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(grammar)
+
+
+def run_benchmark():
+    print(f"{'functions':>10} {'depth':>6} {'mode':>9} {'seconds':>10} {'us/function':>12} {'grammar bytes':>14}")
+    for depth in NESTING_DEPTHS:
+        for count in FUNCTION_COUNTS:
+            function_calls = build_function_calls(count, depth)
+            for mode, options in (("default", {}), ("interned", {"intern_rules": True})):
+                seconds, size = time_generation(function_calls, **options)
+                print(f"{count:>10} {depth:>6} {mode:>9} {seconds:>10.4f} {seconds / count * 1e6:>12.1f} {size:>14}")
+
+    print()
+    print(f"{'width':>10} {'seconds':>10} {'us/field':>12} {'grammar bytes':>14}")
+    for width in WIDTHS:
+        seconds, size = time_generation([build_wide_function_call(width)])
+        print(f"{width:>10} {seconds:>10.4f} {seconds / width * 1e6:>12.2f} {size:>14}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,51 @@
+import json
+import random
+import time
+
+from llm_function_calling.llm_function_calling.json_decoding import available_json_backends, get_json_decoder
+
+ITERATIONS = 2000
+
+
+def build_payloads():
+    """Function call JSONs shaped like the example functions in gpt_functions.py."""
+    random.seed(0)
+    send_message = {"function": "send_message", "params": {
+        "inner_thoughts": " ".join(random.choice(["the", "user", "asked", "about", "a", "long", "poem"])
+                                   for _ in range(800)),
+        "message": "Here is the poem you asked for.",
+    }}
+    analyze_scientific_data = {"function": "analyze_scientific_data", "params": {
+        "experiment_details": {"title": "Spectroscopy", "researcher": "Dr. Doe", "date": "2024-01-01",
+                               "instrumentation": {"type": "spectrometer", "model": "X-1000"}},
+        "samples": [{"sampleId": f"S{i}", "measurements": [round(random.random(), 5) for _ in range(500)]}
+                    for i in range(20)],
+        "processing-options": "Extended",
+    }}
+    create_order = {"function": "create_order", "params": {
+        "user_id": "jdoe",
+        "items": [{"item_id": f"item-{i}", "quantity": i + 1, "category": "Books"} for i in range(100)],
+    }}
+    return {name: json.dumps(payload, separators=(",", ":")) for name, payload in
+            (("send_message", send_message), ("analyze_scientific_data", analyze_scientific_data),
+             ("create_order", create_order))}
+
+
+def run_benchmark():
+    backends = [name for name, installed in available_json_backends().items() if installed]
+    print(f"Installed backends: {', '.join(backends)}")
+    print(f"{'payload':>24} {'bytes':>8} " + " ".join(f"{name + ' us':>12}" for name in backends))
+    for name, payload in build_payloads().items():
+        timings = []
+        for backend in backends:
+            decode = get_json_decoder(backend)
+            assert decode(payload) == json.loads(payload)
+            start = time.perf_counter()
+            for _ in range(ITERATIONS):
+                decode(payload)
+            timings.append((time.perf_counter() - start) / ITERATIONS * 1e6)
+        print(f"{name:>24} {len(payload):>8} " + " ".join(f"{timing:>12.1f}" for timing in timings))
+
+
+if __name__ == "__main__":
+    run_benchmark()
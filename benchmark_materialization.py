@@ -0,0 +1,61 @@
+import time
+
+from llm_function_calling.llm_function_calling import gpt_functions
+from llm_function_calling.llm_function_calling.function_call import DataType
+from llm_function_calling.llm_function_calling.parameter_materialization import compile_materializer
+
+ITERATIONS = 20000
+
+CASES = [
+    (gpt_functions.create_user_profile, {"address": gpt_functions.Address}, {
+        "username": "jdoe", "email": "jdoe@example.com", "is_active": True,
+        "address": {"street": "1 Main St", "city": "Springfield", "zip_code": "62701"},
+    }),
+    (gpt_functions.create_order, {"items": gpt_functions.OrderItem, "items.category": gpt_functions.ItemCategory}, {
+        "user_id": "jdoe",
+        "items": [{"item_id": f"item-{i}", "quantity": i + 1, "category": "Books"} for i in range(10)],
+    }),
+]
+
+
+def generic_materialize(parameters, class_map, params, path=""):
+    """Reference converter that walks the schema and looks up the class map on every call."""
+    result = {}
+    for name, value in params.items():
+        param = parameters.get(name)
+        field_path = f"{path}.{name}" if path else name
+        result[name] = value if param is None else generic_convert(param, class_map, value, field_path)
+    return result
+
+
+def generic_convert(param, class_map, value, path):
+    target = class_map.get(path)
+    if param.type == DataType.ARRAY:
+        return [generic_convert(param.element_type, class_map, item, path) for item in value]
+    if param.type == DataType.OBJECT:
+        fields = generic_materialize(param.structure or {}, class_map, value, path)
+        return target(**fields) if target is not None else fields
+    # Enum classes look up the member by value
+    return target(value) if target is not None else value
+
+
+def measure(function, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return time.perf_counter() - start
+
+
+def run_benchmark():
+    print(f"{'function':>20} {'generic us/call':>16} {'compiled us/call':>17} {'speedup':>8}")
+    for function_call, class_map, params in CASES:
+        properties = function_call.parameters.properties
+        materialize = compile_materializer(function_call, class_map)
+        generic = measure(lambda: generic_materialize(properties, class_map, params), ITERATIONS)
+        compiled = measure(lambda: materialize(params), ITERATIONS)
+        print(f"{function_call.name:>20} {generic / ITERATIONS * 1e6:>16.2f} {compiled / ITERATIONS * 1e6:>17.2f} "
+              f"{generic / compiled:>7.1f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark()
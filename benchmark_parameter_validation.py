@@ -0,0 +1,83 @@
+import time
+
+from llm_function_calling.llm_function_calling import gpt_functions
+from llm_function_calling.llm_function_calling.function_call import DataType
+from llm_function_calling.llm_function_calling.parameter_validation import compile_validator
+
+ITERATIONS = 20000
+
+ADDRESS = {"street": "1 Main St", "city": "Springfield", "zip_code": "62701"}
+
+PARAMS = {
+    "create_user_profile": {
+        "username": "jdoe", "email": "jdoe@example.com", "address": ADDRESS, "is_active": True,
+    },
+    "create_order": {
+        "user_id": "jdoe",
+        "items": [{"item_id": f"item-{i}", "quantity": i + 1, "category": "Electronics"} for i in range(10)],
+    },
+}
+
+TYPE_NAMES = {str: "string", bool: "boolean", int: "number", float: "float", dict: "object", list: "array"}
+
+
+def naive_validate(parameters, params, path=""):
+    """Reference validator that walks the FunctionParameter schema on every call."""
+    errors = []
+    if not isinstance(params, dict):
+        return [(path, "expected object")]
+    for name, param in parameters.items():
+        field_path = f"{path}.{name}" if path else name
+        if name not in params:
+            if param.required:
+                errors.append((field_path, "missing required field"))
+            continue
+        errors.extend(naive_validate_value(param, params[name], field_path))
+    for name in params:
+        if name not in parameters:
+            errors.append((f"{path}.{name}" if path else name, "unexpected field"))
+    return errors
+
+
+def naive_validate_value(param, value, path):
+    if param.type == DataType.OBJECT:
+        return naive_validate(param.structure or {}, value, path)
+    if param.type == DataType.ARRAY:
+        if not isinstance(value, list):
+            return [(path, "expected array")]
+        errors = []
+        for index, item in enumerate(value):
+            errors.extend(naive_validate_value(param.element_type, item, f"{path}[{index}]"))
+        return errors
+    if param.enum:
+        return [] if value in param.enum else [(path, "unexpected enum value")]
+    type_name = TYPE_NAMES.get(type(value))
+    if param.type == DataType.FLOAT and type_name == "number":
+        type_name = "float"
+    return [] if type_name == param.type.value else [(path, f"expected {param.type.value}")]
+
+
+def measure(function, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return time.perf_counter() - start
+
+
+def run_benchmark():
+    print(f"{'function':>20} {'naive us/call':>14} {'compiled us/call':>17} {'speedup':>8}")
+    for function_call in (gpt_functions.create_user_profile, gpt_functions.create_order):
+        params = PARAMS[function_call.name]
+        validate = compile_validator(function_call)
+        properties = function_call.parameters.properties
+        assert not naive_validate(properties, params)
+        validate(params)
+
+        naive = measure(lambda: naive_validate(properties, params), ITERATIONS)
+        compiled = measure(lambda: validate(params), ITERATIONS)
+        print(f"{function_call.name:>20} {naive / ITERATIONS * 1e6:>14.2f} {compiled / ITERATIONS * 1e6:>17.2f} "
+              f"{naive / compiled:>7.1f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark()
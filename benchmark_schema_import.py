@@ -0,0 +1,66 @@
+import json
+import os
+import tempfile
+import time
+
+from llm_function_calling.llm_function_calling.schema_import import ToolCatalogImporter, import_tool_catalog
+
+TOOL_COUNT = 5000
+
+
+def build_catalog(count):
+    """OpenAI tools shaped like gpt_functions.py: shared boilerplate parameters, enums and nested objects."""
+    tools = []
+    for i in range(count):
+        tools.append({"type": "function", "function": {
+            "name": f"tool_{i}",
+            "description": f"Performs operation number {i}.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "inner_thoughts": {"type": "string", "description": "Your inner thoughts while writing the call."},
+                    "query": {"type": "string", "description": f"The query for operation {i}."},
+                    "page": {"type": "integer", "description": "Page of the results."},
+                    "sort": {"type": "string", "enum": ["relevance", "date", f"field_{i % 10}"]},
+                    "items": {"type": "array", "items": {
+                        "type": "object",
+                        "properties": {"item_id": {"type": "string"}, "quantity": {"type": "integer"}},
+                        "required": ["item_id", "quantity"],
+                    }},
+                    "require_heartbeat": {"type": "boolean",
+                                          "description": "Set this to true to get control back after execution."},
+                },
+                "required": ["inner_thoughts", "query", "require_heartbeat"],
+            },
+        }})
+    return tools
+
+
+def measure(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def run_benchmark():
+    with tempfile.TemporaryDirectory() as directory:
+        catalog_path = os.path.join(directory, "tools.json")
+        with open(catalog_path, 'w', encoding='utf-8') as file:
+            json.dump(build_catalog(TOOL_COUNT), file)
+
+        print(f"{TOOL_COUNT} tools, {os.path.getsize(catalog_path) / 1e6:.1f} MB catalog")
+        print(f"{'operation':>40} {'ms':>10}")
+        print(f"{'convert (no cache)':>40} {measure(lambda: import_tool_catalog(catalog_path)) * 1000:>10.1f}")
+        cache_dir = os.path.join(directory, "cache")
+        importer = ToolCatalogImporter(cache_dir=cache_dir)
+        rows = [
+            ("first load (convert + freeze + store)", measure(lambda: importer.load(catalog_path))),
+            ("repeat load (memory)", measure(lambda: importer.load(catalog_path))),
+            ("restart load (disk)", measure(lambda: ToolCatalogImporter(cache_dir=cache_dir).load(catalog_path))),
+        ]
+        for name, elapsed in rows:
+            print(f"{name:>40} {elapsed * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
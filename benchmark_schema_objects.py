@@ -0,0 +1,76 @@
+import time
+import tracemalloc
+
+from llm_function_calling.llm_function_calling.function_call import DataType, FunctionCall, FunctionParameters, \
+    FunctionParameter
+from llm_function_calling.llm_function_calling.grammar_cache import fingerprint_function_calls
+
+FUNCTION_COUNT = 10000
+REPEATS = 5
+
+
+def build_function_calls(count):
+    """Tool definitions shaped like gpt_functions.py: shared boilerplate parameters and a nested address."""
+    function_calls = []
+    for i in range(count):
+        address = {
+            "street": FunctionParameter(DataType.STRING, True, "Street name and number"),
+            "city": FunctionParameter(DataType.STRING, True, "City name"),
+            "zip_code": FunctionParameter(DataType.STRING, True, "Postal or ZIP code"),
+        }
+        function_calls.append(FunctionCall(f"tool_{i}", f"Performs operation number {i}.", FunctionParameters({
+            "inner_thoughts": FunctionParameter(DataType.STRING, True, "Your inner thoughts while writing the call."),
+            "query": FunctionParameter(DataType.STRING, True, f"The query for operation {i}."),
+            "page": FunctionParameter(DataType.NUMBER, False, "Page of the results."),
+            "address": FunctionParameter(DataType.OBJECT, False, "Address to use.", structure=address),
+            "require_heartbeat": FunctionParameter(DataType.BOOLEAN, True,
+                                                   "Set this to true to get control back after execution."),
+        })))
+    return function_calls
+
+
+def measure_memory(build):
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def best_time(function):
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_benchmark():
+    mutable, mutable_bytes = measure_memory(lambda: build_function_calls(FUNCTION_COUNT))
+    source = build_function_calls(FUNCTION_COUNT)
+    frozen, frozen_bytes = measure_memory(lambda: [function_call.freeze() for function_call in source])
+    intern_table = {}
+    interned, interned_bytes = measure_memory(lambda: [function_call.freeze(intern_table) for function_call in source])
+    intern_table.clear()
+
+    print(f"{FUNCTION_COUNT} functions")
+    print(f"{'variant':>16} {'MB':>8}")
+    for name, size in (("mutable", mutable_bytes), ("frozen", frozen_bytes), ("frozen+interned", interned_bytes)):
+        print(f"{name:>16} {size / 1e6:>8.2f}")
+
+    print(f"\n{'operation':>40} {'ms':>9}")
+    lookup = {function_call: index for index, function_call in enumerate(interned)}
+    operations = [
+        ("fingerprint mutable toolset", lambda: fingerprint_function_calls(mutable)),
+        ("fingerprint frozen toolset (memoized)", lambda: fingerprint_function_calls(interned)),
+        ("hash frozen toolset tuple", lambda: hash(tuple(interned))),
+        ("dict lookup of every frozen call", lambda: [lookup[function_call] for function_call in interned]),
+    ]
+    for name, operation in operations:
+        print(f"{name:>40} {best_time(operation) * 1e3:>9.3f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
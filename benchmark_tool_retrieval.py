@@ -0,0 +1,70 @@
+import random
+import time
+
+from llm_function_calling.llm_function_calling.function_call import DataType, FunctionCall, FunctionParameters, \
+    FunctionParameter
+from llm_function_calling.llm_function_calling.tool_retrieval import ToolRetrievalIndex
+
+TOOL_COUNTS = [300, 3000]
+QUERY_COUNT = 1000
+TOP_K = 8
+
+VOCABULARY = ("account address archive balance booking calendar cancel channel customer database delete "
+              "deploy document download email event expense file flight forecast invoice issue ledger "
+              "location meeting memory message metric order payment playlist price product profile query "
+              "recipe refund report reservation schedule search shipment stock subscription task temperature "
+              "ticket translation upload user weather").split()
+VERBS = "create get list update delete search send fetch cancel schedule summarize export".split()
+
+
+def build_function_calls(count, rng):
+    """Tools shaped like gpt_functions.py with shared boilerplate parameters and topic-specific descriptions."""
+    function_calls = []
+    for i in range(count):
+        verb, topic = rng.choice(VERBS), rng.choice(VOCABULARY)
+        words = " ".join(rng.sample(VOCABULARY, 6))
+        function_calls.append(FunctionCall(f"{verb}_{topic}_{i}", f"{verb.capitalize()} a {topic} using {words}.",
+                                           FunctionParameters({
+            "inner_thoughts": FunctionParameter(DataType.STRING, True, "Your inner thoughts while writing the call."),
+            f"{topic}_id": FunctionParameter(DataType.STRING, True, f"Identifier of the {topic}."),
+            "query": FunctionParameter(DataType.STRING, False, f"Free text filter for {' '.join(rng.sample(VOCABULARY, 3))}."),
+            "require_heartbeat": FunctionParameter(DataType.BOOLEAN, True,
+                                                   "Set this to true to get control back after execution."),
+        })))
+    return function_calls
+
+
+def build_queries(count, rng):
+    return [f"please {rng.choice(VERBS)} the {rng.choice(VOCABULARY)} for my {rng.choice(VOCABULARY)} "
+            f"and check the {rng.choice(VOCABULARY)}" for _ in range(count)]
+
+
+def run_benchmark():
+    rng = random.Random(0)
+    queries = build_queries(QUERY_COUNT, rng)
+    print(f"{'tools':>6} {'build ms':>9} {'add us':>8} {'search us/query':>16} {'p99 us':>8}")
+    for count in TOOL_COUNTS:
+        function_calls = build_function_calls(count, rng)
+        start = time.perf_counter()
+        index = ToolRetrievalIndex(function_calls)
+        build = time.perf_counter() - start
+
+        extra = build_function_calls(100, rng)
+        start = time.perf_counter()
+        for function_call in extra:
+            index.add(function_call)
+        add = (time.perf_counter() - start) / len(extra)
+
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query, TOP_K)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        mean = sum(latencies) / len(latencies)
+        p99 = latencies[int(len(latencies) * 0.99)]
+        print(f"{count:>6} {build * 1000:>9.1f} {add * 1e6:>8.1f} {mean * 1e6:>16.1f} {p99 * 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,122 @@
+import random
+import sys
+
+from llm_function_calling.llm_function_calling import gpt_functions
+from llm_function_calling.llm_function_calling.function_call import DataType, FunctionCall, FunctionParameters, \
+    FunctionParameter
+from llm_function_calling.llm_function_calling.function_calling_grammar_generator import generate_gbnf_grammar
+from llm_function_calling.llm_function_calling.grammar_analyzer import parse_gbnf_rules, tokenize_rule_body, \
+    parse_alternatives
+
+PREFIX_NAMES = ["get", "get_user", "get_users", "get_user_profile", "get_usage", "set", "settings", "s", "a", "ab",
+                "abc", "abd", "b"]
+RANDOM_REGISTRIES = 20
+
+
+def build_function_calls(names):
+    return [FunctionCall(name, f"Function {name}.", FunctionParameters({
+        "query": FunctionParameter(DataType.STRING, True, "The query."),
+        "options": FunctionParameter(DataType.OBJECT, False, "Options.", structure={
+            "mode": FunctionParameter(DataType.ENUM, True, enum=["fast", "full"]),
+        }),
+    })) for name in names]
+
+
+def random_names(rng):
+    """Short names over a small alphabet, so many of them share prefixes or are prefixes of each other."""
+    names = set()
+    count = rng.randint(1, 40)
+    while len(names) < count:
+        names.add("".join(rng.choice("ab_") for _ in range(rng.randint(1, 6))).strip("_") or "a")
+    return sorted(names, key=lambda _: rng.random())
+
+
+def expand(alternatives, rules, expanded_rules):
+    """
+    Finite language of a rule body as a set of tuples of literal text and opaque rule references.
+    Rules in expanded_rules are inlined; all other references are kept as atoms.
+    """
+    language = set()
+    for sequence in alternatives:
+        sentences = {()}
+        for symbol in sequence:
+            if symbol.repeat:
+                raise ValueError(f"Unexpected repetition in root rule: {symbol.value}{symbol.repeat}")
+            if symbol.kind == "literal":
+                options = {(("literal", symbol.value[1:-1]),)}
+            elif symbol.kind == "group":
+                options = expand(symbol.value, rules, expanded_rules)
+            elif symbol.kind == "ref" and symbol.value in expanded_rules:
+                options = expand(parse_alternatives(tokenize_rule_body(rules[symbol.value]))[0], rules,
+                                 expanded_rules)
+            else:
+                options = {(("ref", symbol.value),)}
+            sentences = {sentence + option for sentence in sentences for option in options}
+        language |= {merge_literals(sentence) for sentence in sentences}
+    return language
+
+
+def merge_literals(sentence):
+    merged = []
+    for kind, value in sentence:
+        if kind == "literal" and merged and merged[-1][0] == "literal":
+            merged[-1] = ("literal", merged[-1][1] + value)
+        else:
+            merged.append((kind, value))
+    return tuple(merged)
+
+
+def describe(sentence):
+    return "".join(value if kind == "literal" else f"<{value}>" for kind, value in sentence)
+
+
+def root_language(grammar, shared_rules):
+    rules = parse_gbnf_rules(grammar)
+    expanded_rules = set(rules) - shared_rules - {"root"}
+    return expand(parse_alternatives(tokenize_rule_body(rules["root"]))[0], rules, expanded_rules)
+
+
+def check(function_calls, intern_rules):
+    """Return a list of differences between the flat and the factored grammar of function_calls."""
+    flat = generate_gbnf_grammar(function_calls, intern_rules=intern_rules, factor_prefixes=False)
+    factored = generate_gbnf_grammar(function_calls, intern_rules=intern_rules, factor_prefixes=True)
+    flat_rules, factored_rules = parse_gbnf_rules(flat), parse_gbnf_rules(factored)
+
+    # Rules of the factored grammar other than root must be emitted unchanged by the flat grammar
+    shared_rules = set(factored_rules) - {"root"}
+    problems = [f"rule {name} differs" for name in sorted(shared_rules)
+                if flat_rules.get(name) != factored_rules[name]]
+    flat_language = root_language(flat, shared_rules)
+    factored_language = root_language(factored, shared_rules)
+    if len(flat_language) != len(function_calls):
+        problems.append(f"flat root accepts {len(flat_language)} calls for {len(function_calls)} functions")
+    problems += [f"only flat accepts {describe(sentence)}" for sentence in sorted(flat_language - factored_language)]
+    problems += [f"only factored accepts {describe(sentence)}"
+                 for sentence in sorted(factored_language - flat_language)]
+    return problems
+
+
+def main():
+    rng = random.Random(0)
+    registries = [("prefix names", PREFIX_NAMES), ("single function", ["get"])]
+    registries += [(f"random names {i}", random_names(rng)) for i in range(RANDOM_REGISTRIES)]
+    registries.append(("example functions", None))
+
+    failures = 0
+    for label, names in registries:
+        if names is None:
+            function_calls = [value for value in vars(gpt_functions).values() if isinstance(value, FunctionCall)]
+        else:
+            function_calls = build_function_calls(names)
+        for intern_rules in (False, True):
+            problems = check(function_calls, intern_rules)
+            failures += bool(problems)
+            status = "ok" if not problems else "FAILED"
+            print(f"{label:>20} intern_rules={intern_rules!s:<5} {len(function_calls):>3} functions: {status}")
+            for problem in problems[:10]:
+                print(f"    {problem}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+import bisect
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Sequence
+
+# Upper bounds of the latency buckets in seconds, from 10 microseconds to 10 seconds
+DEFAULT_LATENCY_BUCKETS = [0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                           0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+STAGES = ["parse", "transform", "execute"]
+
+# Name under which calls are recorded that could not be decoded or name no registered function
+UNKNOWN_FUNCTION = "<unknown>"
+
+MetricsExporter = Callable[[str, Dict[str, float], Optional[Exception]], None]
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with count, sum and maximum."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def to_dict(self) -> dict:
+        """Cumulative bucket counts in the Prometheus style, the last bucket being +Inf."""
+        cumulative = []
+        total = 0
+        for bound, count in zip(self.buckets + [float("inf")], self.counts):
+            total += count
+            cumulative.append([bound, total])
+        return {"count": self.count, "sum": self.sum, "max": self.max, "buckets": cumulative}
+
+
+class FunctionMetrics:
+    def __init__(self, buckets: Sequence[float]):
+        self.calls = 0
+        self.errors = 0
+        self.stages = {stage: LatencyHistogram(buckets) for stage in STAGES}
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "stages": {stage: histogram.to_dict() for stage, histogram in self.stages.items()},
+        }
+
+
+class CallMetrics:
+    """
+    Per-function call counts, error counts and latency histograms of the parse, transform (validation and
+    param transformer) and execute stages, as recorded by LLMFunctionCaller when metrics are enabled.
+    An optional exporter is called after every call with the function name, the stage timings in seconds
+    and the exception raised, if any, e.g. to forward them to a metrics system.
+    """
+
+    def __init__(self, exporter: Optional[MetricsExporter] = None,
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.exporter = exporter
+        self.buckets = list(buckets)
+        self._functions: Dict[str, FunctionMetrics] = {}
+        self._lock = threading.Lock()
+
+    def record(self, function_name: Optional[str], timings: Dict[str, float],
+               error: Optional[Exception] = None) -> None:
+        if function_name is None:
+            function_name = UNKNOWN_FUNCTION
+        with self._lock:
+            metrics = self._functions.get(function_name)
+            if metrics is None:
+                metrics = self._functions[function_name] = FunctionMetrics(self.buckets)
+            metrics.calls += 1
+            if error is not None:
+                metrics.errors += 1
+            for stage, seconds in timings.items():
+                metrics.stages[stage].observe(seconds)
+        if self.exporter is not None:
+            try:
+                self.exporter(function_name, timings, error)
+            except Exception as e:
+                logging.warning(f"Metrics exporter failed: {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a point-in-time copy of all metrics as plain dicts, keyed by function name."""
+        with self._lock:
+            return {name: metrics.to_dict() for name, metrics in self._functions.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._functions.clear()
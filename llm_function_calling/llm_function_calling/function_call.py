@@ -1,5 +1,6 @@
 from enum import Enum
-from typing import Optional, Dict, List
+from types import MappingProxyType
+from typing import Optional, Dict, List, Mapping
 
 
 class DataType(Enum):
@@ -27,14 +28,178 @@ class FunctionParameter:
         self.element_type = element_type
         self.precision = precision
 
+    def to_dict(self) -> dict:
+        """Return a plain dict representation of the parameter, keeping the order of nested fields."""
+        return {
+            "type": self.type.value,
+            "required": self.required,
+            "description": self.description,
+            "enum": list(self.enum) if self.enum is not None else None,
+            "structure": {name: param.to_dict() for name, param in self.structure.items()}
+            if self.structure is not None else None,
+            "element_type": self.element_type.to_dict() if self.element_type is not None else None,
+            "precision": self.precision,
+        }
+
+    def freeze(self, intern_table: Optional[dict] = None) -> 'FrozenFunctionParameter':
+        """
+        Return an immutable, hashable copy. Pass the same intern_table dict when freezing many definitions
+        to share equal parameters and structures between them instead of storing copies.
+        """
+        return FrozenFunctionParameter(
+            self.type, self.required, self.description,
+            enum=self.enum,
+            structure={name: param.freeze(intern_table) for name, param in self.structure.items()}
+            if self.structure is not None else None,
+            element_type=self.element_type.freeze(intern_table) if self.element_type is not None else None,
+            precision=self.precision,
+        ).intern(intern_table)
+
 
 class FunctionParameters:
     def __init__(self, properties: Dict[str, FunctionParameter]):
         self.properties = properties
 
+    def to_dict(self) -> dict:
+        return {name: param.to_dict() for name, param in self.properties.items()}
+
+    def freeze(self, intern_table: Optional[dict] = None) -> 'FrozenFunctionParameters':
+        return FrozenFunctionParameters({name: param.freeze(intern_table)
+                                         for name, param in self.properties.items()}).intern(intern_table)
+
 
 class FunctionCall:
     def __init__(self, name: str, description: str, parameters: FunctionParameters):
         self.name = name
         self.parameters = parameters
         self.description = description
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "description": self.description,
+            "parameters": self.parameters.to_dict(),
+        }
+
+    def freeze(self, intern_table: Optional[dict] = None) -> 'FrozenFunctionCall':
+        """Return an immutable, hashable copy, see FunctionParameter.freeze."""
+        return FrozenFunctionCall(self.name, self.description, self.parameters.freeze(intern_table))
+
+
+class FrozenSchemaObject:
+    """
+    Base of the immutable schema classes. Instances use __slots__, cannot be modified after construction
+    and carry a structural hash computed once, so they are cheap to hold in large registries and can be
+    used directly as dict and cache keys. Two instances are equal if all of their fields are equal.
+    """
+    __slots__ = ("_hash",)
+
+    def _key(self) -> tuple:
+        raise NotImplementedError
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if type(other) is not type(self) or other._hash != self._hash:
+            return False
+        return self._key() == other._key()
+
+    def __reduce__(self):
+        return type(self), self._init_args()
+
+    def _init_args(self) -> tuple:
+        raise NotImplementedError
+
+    def intern(self, intern_table: Optional[dict]):
+        """Return the instance equal to self already in intern_table, adding self if there is none."""
+        if intern_table is None:
+            return self
+        return intern_table.setdefault(self, self)
+
+
+class FrozenFunctionParameter(FrozenSchemaObject):
+    """Immutable counterpart of FunctionParameter. enum is a tuple and structure a read-only mapping."""
+    __slots__ = ("type", "required", "description", "enum", "structure", "element_type", "precision")
+
+    def __init__(self, parameter_type: DataType, required: bool,
+                 description: Optional[str] = None,
+                 enum: Optional[List[str]] = None,
+                 structure: Optional[Mapping[str, 'FrozenFunctionParameter']] = None,
+                 element_type: Optional['FrozenFunctionParameter'] = None,
+                 precision: Optional[int] = None):
+        enum = tuple(enum) if enum is not None else None
+        structure = MappingProxyType(dict(structure)) if structure is not None else None
+        set_field = object.__setattr__
+        set_field(self, "type", parameter_type)
+        set_field(self, "required", required)
+        set_field(self, "description", description)
+        set_field(self, "enum", enum)
+        set_field(self, "structure", structure)
+        set_field(self, "element_type", element_type)
+        set_field(self, "precision", precision)
+        set_field(self, "_hash", hash(self._key()))
+
+    def _key(self) -> tuple:
+        return (self.type, self.required, self.description, self.enum,
+                tuple(self.structure.items()) if self.structure is not None else None,
+                self.element_type, self.precision)
+
+    def _init_args(self) -> tuple:
+        return (self.type, self.required, self.description, self.enum,
+                dict(self.structure) if self.structure is not None else None, self.element_type, self.precision)
+
+    to_dict = FunctionParameter.to_dict
+
+    def freeze(self, intern_table: Optional[dict] = None) -> 'FrozenFunctionParameter':
+        return self.intern(intern_table)
+
+
+class FrozenFunctionParameters(FrozenSchemaObject):
+    """Immutable counterpart of FunctionParameters; properties is a read-only mapping."""
+    __slots__ = ("properties",)
+
+    def __init__(self, properties: Mapping[str, FrozenFunctionParameter]):
+        object.__setattr__(self, "properties", MappingProxyType(dict(properties)))
+        object.__setattr__(self, "_hash", hash(self._key()))
+
+    def _key(self) -> tuple:
+        return tuple(self.properties.items())
+
+    def _init_args(self) -> tuple:
+        return (dict(self.properties),)
+
+    to_dict = FunctionParameters.to_dict
+
+    def freeze(self, intern_table: Optional[dict] = None) -> 'FrozenFunctionParameters':
+        return self.intern(intern_table)
+
+
+class FrozenFunctionCall(FrozenSchemaObject):
+    """Immutable, hashable counterpart of FunctionCall, accepted everywhere a FunctionCall is."""
+    __slots__ = ("name", "description", "parameters")
+
+    def __init__(self, name: str, description: str, parameters: FrozenFunctionParameters):
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "description", description)
+        object.__setattr__(self, "parameters", parameters)
+        object.__setattr__(self, "_hash", hash(self._key()))
+
+    def _key(self) -> tuple:
+        return self.name, self.description, self.parameters
+
+    def _init_args(self) -> tuple:
+        return self._key()
+
+    to_dict = FunctionCall.to_dict
+
+    def freeze(self, intern_table: Optional[dict] = None) -> 'FrozenFunctionCall':
+        return self
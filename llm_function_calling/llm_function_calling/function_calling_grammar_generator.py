@@ -1,8 +1,20 @@
+import functools
+import hashlib
+import json
 import os
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from .function_call import FunctionCall, DataType, FunctionParameter
 
+# Bumped whenever the generated grammar changes for the same input, so persisted grammars are not reused.
+GRAMMAR_FORMAT_VERSION = 3
+
+# Enums with at least this many values are compiled into a character trie instead of a flat alternation.
+ENUM_TRIE_THRESHOLD = 32
+
+# Name of the rule matching a single function call when the root rule accepts an array of calls
+MULTI_CALL_ITEM_RULE = "function-call-item"
+
 
 def format_function_names(function_calls):
     # Extract the names from each FunctionCall instance
@@ -14,66 +26,153 @@ def format_function_names(function_calls):
     return formatted_names
 
 
-def generate_enum_rule(enum_rule_name, enum_values):
+class RuleEmitter:
+    """
+    Collects grammar fragments in a list and joins them once in getvalue(), so emitting nested
+    rules is linear in the size of the grammar instead of quadratic with repeated string concatenation.
+    """
+
+    def __init__(self):
+        self.fragments = []
+        self.emit = self.fragments.append
+
+    def getvalue(self):
+        return "".join(self.fragments)
+
+
+def escape_gbnf_literal(text):
+    """Escape backslashes and double quotes so text can be placed inside a GBNF string literal."""
+    return text.replace('\\', '\\\\').replace('"', '\\"')
+
+
+class LiteralTrie:
+    """
+    Character trie over string literals, each ending in a tail expression.
+    to_expression() turns it into nested GBNF alternations in which every shared prefix
+    appears once, so the grammar sampler follows a single stack until the literals diverge.
+    """
+
+    __slots__ = ("children", "tail")
+
+    def __init__(self):
+        self.children = {}
+        self.tail = None
+
+    def insert(self, literal, tail=""):
+        node = self
+        for char in literal:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = LiteralTrie()
+            node = child
+        node.tail = tail
+
+    def to_expression(self):
+        alternatives = []
+        optional = False
+        if self.tail is not None:
+            if self.tail:
+                alternatives.append(self.tail)
+            else:
+                optional = True
+        for char, child in self.children.items():
+            # Collapse chains of single-child nodes into one literal
+            label = char
+            while child.tail is None and len(child.children) == 1:
+                (next_char, child), = child.children.items()
+                label += next_char
+            rest = child.to_expression()
+            alternatives.append(f'"{escape_gbnf_literal(label)}"' + (f" {rest}" if rest else ""))
+
+        if not alternatives:
+            return ""
+        if optional:
+            return "(" + " | ".join(alternatives) + ")?"
+        if len(alternatives) == 1:
+            return alternatives[0]
+        return "(" + " | ".join(alternatives) + ")"
+
+
+def generate_enum_rule(enum_rule_name, enum_values, trie_threshold=ENUM_TRIE_THRESHOLD):
+    emitter = RuleEmitter()
+    emit_enum_rule(emitter, enum_rule_name, enum_values, trie_threshold)
+    return emitter.getvalue()
+
+
+def emit_enum_rule(emitter, enum_rule_name, enum_values, trie_threshold=ENUM_TRIE_THRESHOLD):
     # Start the enum rule with its name
-    enum_rule = f"{enum_rule_name} ::= "
-    # Add each enum value
-    for i, value in enumerate(enum_values):
-        if i > 0:
-            enum_rule += " | "  # Add a separator for multiple values
-        enum_rule += f'\"\\"{value}\\\""'
-    return enum_rule
+    emitter.emit(f"{enum_rule_name} ::= ")
+    emitter.emit(generate_enum_rule_body(enum_values, trie_threshold))
+
+
+def generate_enum_rule_body(enum_values, trie_threshold=ENUM_TRIE_THRESHOLD):
+    """
+    Generate the right-hand side of an enum rule, one quoted JSON string per value.
+    Enums with at least trie_threshold values are compiled into a character trie, so values sharing a
+    prefix (SKUs, category codes) share grammar stacks while sampling. Pass None to always emit a flat alternation.
+    """
+    if trie_threshold is not None and len(enum_values) >= trie_threshold:
+        trie = LiteralTrie()
+        for value in enum_values:
+            trie.insert(f'"{value}"')
+        return trie.to_expression()
+    # Separate the values with ' | '
+    return " | ".join(f'\"\\"{value}\\\""' for value in enum_values)
 
 
 def generate_object_rule(nested_rule_name, structure):
-    object_rule = f"{format_rule_name(nested_rule_name)} ::= \"{{\" ws "
+    emitter = RuleEmitter()
+    emit_object_rule(emitter, nested_rule_name, structure)
+    return emitter.getvalue()
+
+
+def emit_object_rule(emitter, nested_rule_name, structure):
+    emit = emitter.emit
+    emit(f"{format_rule_name(nested_rule_name)} ::= \"{{\" ws ")
     for j, (sub_param_name, sub_param) in enumerate(structure.items()):
         if j > 0:
-            object_rule += "\",\" ws "  # Include a comma separator for multiple sub-parameters
+            emit("\",\" ws ")  # Include a comma separator for multiple sub-parameters
 
         if sub_param.type in [DataType.OBJECT, DataType.ARRAY]:
             # Recursive call for nested OBJECT or ARRAY
             sub_nested_rule_name = f"{format_rule_name(nested_rule_name)}-{format_rule_name(sub_param_name)}"
-            object_rule += f"\"\\\"{sub_param_name}\\\":\" ws {sub_nested_rule_name} "
-            if sub_param.type == DataType.OBJECT:
-                sub_object_rule = generate_object_rule(sub_nested_rule_name, sub_param.structure)
-                object_rule += "\n" + sub_object_rule
-            elif sub_param.type == DataType.ARRAY:
-                sub_array_rule = generate_array_rule(sub_nested_rule_name, sub_param.element_type)
-                object_rule += "\n" + sub_array_rule
+            emit(f"\"\\\"{sub_param_name}\\\":\" ws {sub_nested_rule_name} ")
+            emit("\n")
+            emit_nested_rule(emitter, sub_nested_rule_name, sub_param)
         elif sub_param.type == DataType.FLOAT and sub_param.precision is not None:
             # Handling FLOAT type with precision in nested object
             float_rule_name = f"float-{sub_param.precision}"
-            object_rule += f"\"\\\"{sub_param_name}\\\":\" ws {float_rule_name} "
+            emit(f"\"\\\"{sub_param_name}\\\":\" ws {float_rule_name} ")
         else:
             # Basic data types or ENUM for nested parameters
             formatted_type = format_data_type(sub_param.type,
                                               nested_rule_name=f"{nested_rule_name}{sub_param_name.capitalize()}",
                                               precision=sub_param.precision)
-            object_rule += f"\"\\\"{sub_param_name}\\\":\" ws {formatted_type}"
+            emit(f"\"\\\"{sub_param_name}\\\":\" ws {formatted_type}")
 
-    object_rule += " ws \"}\""
-    return object_rule
+    emit(" ws \"}\"")
 
 
 def generate_array_rule(nested_rule_name, element_type):
-    array_rule = f"{nested_rule_name} ::= \"[\" ws "
+    emitter = RuleEmitter()
+    emit_array_rule(emitter, nested_rule_name, element_type)
+    return emitter.getvalue()
+
+
+def emit_array_rule(emitter, nested_rule_name, element_type):
+    emit = emitter.emit
+    emit(f"{nested_rule_name} ::= \"[\" ws ")
     if element_type.type in [DataType.OBJECT, DataType.ARRAY]:
         # Recursive call for nested OBJECT or ARRAY in an array
         array_element_rule_name = f"{nested_rule_name}-element"
-        array_rule += f"{array_element_rule_name} (\",\" ws {array_element_rule_name})* "
-        if element_type.type == DataType.OBJECT:
-            array_object_rule = generate_object_rule(array_element_rule_name, element_type.structure)
-            array_rule += "\n" + array_object_rule
-        elif element_type.type == DataType.ARRAY:
-            array_array_rule = generate_array_rule(array_element_rule_name, element_type.element_type)
-            array_rule += "\n" + array_array_rule
+        emit(f"{array_element_rule_name} (\",\" ws {array_element_rule_name})* ")
+        emit("\n")
+        emit_nested_rule(emitter, array_element_rule_name, element_type)
     else:
         # Basic data types for array elements
-        array_rule += element_type.type.value + '("," ws ' + element_type.type.value + ')*'
+        emit(element_type.type.value + '("," ws ' + element_type.type.value + ')*')
 
-    array_rule += " ws \"]\""
-    return array_rule
+    emit(" ws \"]\"")
 
 
 def format_enum_values(enum_values):
@@ -124,85 +223,218 @@ def format_data_type(data_type, nested_rule_name=None, precision=None):
 
 
 def generate_gbnf_float_rules(precisions):
-    gbnf_rules = ""
-    gbnf_rules2 = ""
+    emitter = RuleEmitter()
+    emit_gbnf_float_rules(emitter, precisions)
+    return emitter.getvalue()
+
+
+def emit_gbnf_float_rules(emitter, precisions):
+    emit = emitter.emit
+    precisions = list(precisions)
 
     for precision in precisions:
         # Define the floating point rules with specific precision
-        gbnf_rules += f"\nfloat-{precision} ::= integer-part \".\" fractional-part-{precision}\n"
-        rule_part = ''.join(["[0-9]" for _ in range(precision)])
-        gbnf_rules2 += f"fractional-part-{precision} ::= {rule_part}\n"
+        emit(f"\nfloat-{precision} ::= integer-part \".\" fractional-part-{precision}\n")
     # Define the integer_part rule only once
-    gbnf_rules += "\ninteger-part ::= [0-9]+\n"
-    return gbnf_rules + gbnf_rules2 + "\n"
+    emit("\ninteger-part ::= [0-9]+\n")
+    for precision in precisions:
+        emit(f"fractional-part-{precision} ::= {'[0-9]' * precision}\n")
+    emit("\n")
 
 
 def generate_nested_rule(nested_rule_name, param):
     """Generate rules for nested structures like OBJECT and ARRAY."""
+    emitter = RuleEmitter()
+    emit_nested_rule(emitter, nested_rule_name, param)
+    return emitter.getvalue()
+
+
+def emit_nested_rule(emitter, nested_rule_name, param):
     if param.type == DataType.OBJECT:
-        return generate_object_rule(nested_rule_name, param.structure)
+        emit_object_rule(emitter, nested_rule_name, param.structure)
     elif param.type == DataType.ARRAY:
-        return generate_array_rule(nested_rule_name, param.element_type)
+        emit_array_rule(emitter, nested_rule_name, param.element_type)
 
 
-def generate_parameter_rules(function_name, parameters):
+class RuleInterner:
+    """
+    Structural hashing pass for nested parameter rules.
+    Every distinct object, array or enum shape is emitted once under a name derived from the hash of its
+    rule body, and every use of that shape refers to the same rule. Because nested rule bodies contain the
+    hashed names of their children, equal names mean equal structures.
+    """
+
+    def __init__(self, enum_trie_threshold=ENUM_TRIE_THRESHOLD):
+        self.enum_trie_threshold = enum_trie_threshold
+        self.rules = {}
+        self.float_precisions = set()
+
+    def reference(self, param):
+        """Return the rule reference that matches the value of param, interning nested shapes."""
+        if param.type == DataType.OBJECT and param.structure is not None:
+            fields = [f"\"\\\"{name}\\\":\" ws {self.reference(sub_param)}" for name, sub_param in param.structure.items()]
+            return self.intern("object", "\"{\" ws " + " \",\" ws ".join(fields) + " ws \"}\"")
+        if param.type == DataType.ARRAY and param.element_type is not None:
+            element = self.reference(param.element_type)
+            return self.intern("array", f"\"[\" ws {element} (\",\" ws {element})* ws \"]\"")
+        if param.enum:
+            return self.intern("enum", generate_enum_rule_body(param.enum, self.enum_trie_threshold))
+        if param.type == DataType.FLOAT and param.precision is not None:
+            self.float_precisions.add(param.precision)
+        return format_data_type(param.type, precision=param.precision)
+
+    def intern(self, kind, body):
+        rule_name = f"{kind}-{hashlib.sha256(body.encode('utf-8')).hexdigest()[:12]}"
+        existing = self.rules.setdefault(rule_name, body)
+        if existing != body:
+            raise ValueError(f"Rule name collision for {rule_name}")
+        return rule_name
+
+    def generate_rules(self):
+        """Return the interned rules, sorted by name so the output does not depend on insertion order."""
+        return [f"{rule_name} ::= {self.rules[rule_name]}" for rule_name in sorted(self.rules)]
+
+
+def generate_interned_parameter_rules(function_name, parameters, interner):
+    """Generate the parameter rule of a function, pointing nested structures at interned rules."""
+    fields = [f"\"\\\"{format_rule_name(param_name)}\\\":\" ws {interner.reference(param)}"
+              for param_name, param in parameters.items()]
+    return f"{function_name}-params ::= \"{{\" ws " + " \",\" ws ".join(fields) + " ws \"}\""
+
+
+def generate_parameter_rules(function_name, parameters, enum_trie_threshold=ENUM_TRIE_THRESHOLD):
     """Generate GBNF rules for function parameters."""
-    param_rules = f"{function_name}-params ::= \"{{\" ws "
+    emitter = RuleEmitter()
+    emit_parameter_rules(emitter, function_name, parameters, enum_trie_threshold)
+    return emitter.getvalue()
+
+
+def emit_parameter_rules(emitter, function_name, parameters, enum_trie_threshold=ENUM_TRIE_THRESHOLD):
+    emit = emitter.emit
+    emit(f"{function_name}-params ::= \"{{\" ws ")
 
     for i, (param_name, param) in enumerate(parameters.items()):
-        param_rules += "\",\" ws " if i > 0 else ""  # Add comma separator for multiple parameters
+        if i > 0:
+            emit("\",\" ws ")  # Add comma separator for multiple parameters
         nested_rule_name = f"{function_name}-{format_rule_name(param_name)}"
-        param_rules += f"\"\\\"{format_rule_name(param_name)}\\\":\" ws "
+        emit(f"\"\\\"{format_rule_name(param_name)}\\\":\" ws ")
         if param.type in [DataType.OBJECT, DataType.ARRAY]:
-            param_rules += f"{nested_rule_name} "
-            param_rules += "\n" + generate_nested_rule(nested_rule_name, param)
+            emit(f"{nested_rule_name} ")
+            emit("\n")
+            emit_nested_rule(emitter, nested_rule_name, param)
         elif param.enum:
-            param_rules += f"{nested_rule_name} "
-            param_rules += "\n" + generate_enum_rule(nested_rule_name, param.enum)
+            emit(f"{nested_rule_name} ")
+            emit("\n")
+            emit_enum_rule(emitter, nested_rule_name, param.enum, enum_trie_threshold)
         else:
-            param_rules += format_data_type(param.type)
-    param_rules += " ws \"}\""
-    return param_rules
+            emit(format_data_type(param.type))
+    emit(" ws \"}\"")
 
 
-def generate_gbnf_rule(function_call):
-    """Generate a GBNF grammar rule for a given FunctionCall."""
+def generate_gbnf_rule(function_call, interner=None, enum_trie_threshold=ENUM_TRIE_THRESHOLD):
+    """
+    Generate a GBNF grammar rule for a given FunctionCall.
+    If a RuleInterner is passed, nested objects, arrays and enums are added to it instead of
+    being emitted as per-function rules.
+    """
     function_name = format_rule_name(function_call.name)
     function_rule = f"{function_name} ::= \"{{\" ws \"\\\"function\\\":\" ws \"\\\"{function_call.name}\\\",\" ws \"\\\"params\\\":\" ws {function_name}-params \"}}\""
-    param_rules = generate_parameter_rules(function_name, function_call.parameters.properties)
+    if interner is not None:
+        param_rules = generate_interned_parameter_rules(function_name, function_call.parameters.properties, interner)
+    else:
+        param_rules = generate_parameter_rules(function_name, function_call.parameters.properties, enum_trie_threshold)
     return function_rule, param_rules
 
 
-def generate_gbnf_grammar(function_calls: List[FunctionCall]) -> str:
+def generate_root_rule(function_names, factor_prefixes=True, multi_call=False, max_calls=None):
+    """
+    Generate the root rule for the given function names.
+    With factor_prefixes=True the literal '{"function":"' shared by every function call is emitted once and
+    the function names are compiled into a trie of alternations that branches into each '-params' rule.
+    Otherwise the root rule is a flat alternation of the per-function rules.
+    With multi_call=True the root rule accepts a JSON array of function calls instead, see
+    generate_multi_call_root_rule; the single call rule is then named MULTI_CALL_ITEM_RULE.
+    """
+    rule_name = MULTI_CALL_ITEM_RULE if multi_call else "root"
+    if not factor_prefixes:
+        call_rule = f"{rule_name} ::= " + ' | '.join(format_rule_name(name) for name in function_names)
+    else:
+        trie = LiteralTrie()
+        for name in function_names:
+            trie.insert(name, f"\"\\\",\" ws \"\\\"params\\\":\" ws {format_rule_name(name)}-params \"}}\"")
+        call_rule = f"{rule_name} ::= \"{{\" ws \"\\\"function\\\":\" ws \"\\\"\" {trie.to_expression()}"
+    if multi_call:
+        return generate_multi_call_root_rule(max_calls) + "\n" + call_rule
+    return call_rule
+
+
+def generate_multi_call_root_rule(max_calls=None):
+    """
+    Generate a root rule that accepts a JSON array of one or more function calls, e.g. for independent
+    lookups the model can request in a single generation. max_calls caps the array length; the cap is
+    expressed as nested optional groups so the grammar stays compatible with llama.cpp versions that do
+    not support bounded repetition.
+    """
+    if max_calls is None:
+        return f"root ::= \"[\" ws {MULTI_CALL_ITEM_RULE} (\",\" ws {MULTI_CALL_ITEM_RULE})* ws \"]\""
+    if max_calls < 1:
+        raise ValueError("max_calls must be at least 1")
+    additional_calls = ""
+    for _ in range(max_calls - 1):
+        additional_calls = f" (\",\" ws {MULTI_CALL_ITEM_RULE}{additional_calls})?"
+    return f"root ::= \"[\" ws {MULTI_CALL_ITEM_RULE}{additional_calls} ws \"]\""
+
+
+def generate_gbnf_grammar(function_calls: List[FunctionCall], intern_rules: bool = False,
+                          factor_prefixes: bool = True, enum_trie_threshold: Optional[int] = ENUM_TRIE_THRESHOLD,
+                          multi_call: bool = False, max_calls: Optional[int] = None) -> str:
     """
     Generate a complete GBNF grammar from a list of FunctionCall instances,
     placing all function rules first followed by all parameter rules.
+    With intern_rules=True every distinct nested object, array or enum shape is emitted only once.
+    With factor_prefixes=True (the default) the root rule shares the common prefix of all function calls
+    and branches on the function name character by character; the per-function rules are then not needed.
+    Enums with at least enum_trie_threshold values are compiled into a character trie (None disables this).
+    With multi_call=True the grammar matches a JSON array of up to max_calls function calls (unbounded if None).
     """
-    # Start with the root rule
-    root_rule = "root ::= " + format_function_names(function_calls)
+    interner = RuleInterner(enum_trie_threshold) if intern_rules else None
 
     # Initialize lists to store function rules and parameter rules separately
-    function_rules = [root_rule]
+    function_rules = []
     param_rules = []
 
     # Iterate over each FunctionCall and generate corresponding GBNF rules
     for function_call in function_calls:
-        function_rule, param_rule = generate_gbnf_rule(function_call)
+        function_rule, param_rule = generate_gbnf_rule(function_call, interner, enum_trie_threshold)
 
         # Append the generated rules to their respective lists
-        function_rules.append(function_rule)
+        if not factor_prefixes:
+            function_rules.append(function_rule)
         param_rules.append(param_rule)
 
+    root_rule = generate_root_rule([function_call.name for function_call in function_calls], factor_prefixes,
+                                   multi_call, max_calls)
+
+    if interner is not None:
+        return assemble_gbnf_grammar(root_rule, function_rules, param_rules,
+                                     interner.float_precisions, interner.generate_rules())
+
     # Collect required float precisions
     float_precisions = collect_float_precisions(function_calls)
 
+    return assemble_gbnf_grammar(root_rule, function_rules, param_rules, float_precisions)
+
+
+def assemble_gbnf_grammar(root_rule, function_rules, param_rules, float_precisions, shared_rules=()):
+    """
+    Combine an already generated root rule, function rules, parameter rules, shared (interned) rules and
+    float precisions into a complete grammar.
+    """
     # Generate precision-specific float rules
     float_rules = generate_gbnf_float_rules(float_precisions)
-    function_rules[0] += """ ws "}" """
-    # Combine all rules
-    complete_grammar = "\n".join(function_rules + param_rules + [float_rules])
 
-    return complete_grammar
+    # Combine all rules
+    return "\n".join([root_rule] + list(function_rules) + list(param_rules) + list(shared_rules) + [float_rules])
 
 
 def format_rule_name(name):
@@ -213,14 +445,26 @@ def format_rule_name(name):
     return name.replace('_', '-').lower()
 
 
-def save_grammar_to_file(grammar_str, file_path):
+@functools.lru_cache(maxsize=None)
+def load_primitive_grammar():
+    """Return the contents of primitive.gbnf, reading the file only once per process."""
+    script_path = os.path.abspath(__file__)
+    script_dir = os.path.dirname(script_path)
+    with open(f"{script_dir}/primitive.gbnf", 'r', encoding='utf-8') as file:
+        return file.read()
+
+
+def append_primitive_grammar(grammar_str):
+    """Append the primitive rules (string, boolean, number, ...) to a generated grammar."""
+    return grammar_str + "\n" + load_primitive_grammar()
+
+
+def save_grammar_to_file(grammar_str, file_path, append_primitives=True):
     try:
-        script_path = os.path.abspath(__file__)
-        script_dir = os.path.dirname(script_path)
-        with open(f"{script_dir}/primitive.gbnf", 'r', encoding='utf-8') as file:
-            primary_grammar = file.read()
+        if append_primitives:
+            grammar_str = append_primitive_grammar(grammar_str)
         with open(file_path, 'w', encoding='utf-8') as file:
-            file.write(grammar_str + "\n" + primary_grammar)
+            file.write(grammar_str)
         print(f"Grammar successfully saved to {file_path}")
     except IOError as e:
         print(f"An error occurred while writing to the file: {e}")
@@ -271,6 +515,116 @@ def generate_documentation(function_calls):
     return documentation
 
 
+def collect_shared_structures(function_calls):
+    """
+    Find object structures that are used more than once across the given functions, including inside
+    arrays and other objects. Structures are compared by content. Returns a dict from id() of every
+    structure dict with shared content to a (label, structure) tuple.
+    """
+    keys_by_id = {}
+    counts = {}
+    first_use = {}
+
+    def visit(param_name, param):
+        if param.type == DataType.OBJECT and param.structure:
+            key = keys_by_id.get(id(param.structure))
+            if key is None:
+                key = json.dumps({name: sub_param.to_dict() for name, sub_param in param.structure.items()})
+                keys_by_id[id(param.structure)] = key
+            counts[key] = counts.get(key, 0) + 1
+            first_use.setdefault(key, (param_name, param.structure))
+            for sub_param_name, sub_param in param.structure.items():
+                visit(sub_param_name, sub_param)
+        elif param.type == DataType.ARRAY and param.element_type:
+            visit(param_name, param.element_type)
+
+    for func in function_calls:
+        for param_name, param in func.parameters.properties.items():
+            visit(param_name, param)
+
+    shared_by_key = {}
+    used_labels = set()
+    for key, count in counts.items():
+        if count < 2:
+            continue
+        param_name, structure = first_use[key]
+        base_label = ''.join(word.capitalize() for word in param_name.replace('-', '_').split('_'))
+        label = base_label
+        suffix = 2
+        while label in used_labels:
+            label = f"{base_label}{suffix}"
+            suffix += 1
+        used_labels.add(label)
+        shared_by_key[key] = (label, structure)
+    return {structure_id: shared_by_key[key] for structure_id, key in keys_by_id.items() if key in shared_by_key}
+
+
+def generate_compact_documentation(function_calls, max_length=None, length_function=len):
+    """
+    Generate a compact version of generate_documentation for use in prompts.
+    Object structures used more than once are printed once under "Shared Structures" and referred to by label.
+    If max_length is given, descriptions are dropped until length_function(documentation) fits: first those of
+    optional parameters, then those of nested fields, then all parameter descriptions. Function names,
+    descriptions and parameters are always kept, so the result can still exceed a very small budget.
+    """
+    shared_structures = collect_shared_structures(function_calls)
+    documentation = ""
+    for detail_level in range(4):
+        documentation = render_compact_documentation(function_calls, shared_structures, detail_level)
+        if max_length is None or length_function(documentation) <= max_length:
+            break
+    return documentation
+
+
+def render_compact_documentation(function_calls, shared_structures, detail_level=0):
+    lines = ["Available Functions:"]
+
+    def type_text(param):
+        if param.type == DataType.OBJECT and param.structure:
+            shared = shared_structures.get(id(param.structure))
+            return f"object {shared[0]}" if shared else "object"
+        if param.type == DataType.ARRAY and param.element_type:
+            return f"array of {type_text(param.element_type)}"
+        if param.enum:
+            return f"{param.type.value}: {'|'.join(param.enum)}"
+        return param.type.value
+
+    def show_description(param, depth):
+        if not param.description or detail_level >= 3:
+            return False
+        if detail_level >= 2 and depth > 0:
+            return False
+        return not (detail_level >= 1 and not param.required)
+
+    def document_parameter(param_name, param, indent_level, depth):
+        line = f"{'  ' * indent_level}{param_name} ({type_text(param)}{'' if param.required else ', optional'})"
+        if show_description(param, depth):
+            line += f": {param.description}"
+        lines.append(line)
+
+        # Expand fields of objects (directly or as array elements) that are not shared
+        nested = param
+        while nested.type == DataType.ARRAY and nested.element_type:
+            nested = nested.element_type
+        if nested.type == DataType.OBJECT and nested.structure and id(nested.structure) not in shared_structures:
+            for sub_param_name, sub_param in nested.structure.items():
+                document_parameter(sub_param_name, sub_param, indent_level + 1, depth + 1)
+
+    for func in function_calls:
+        lines.append(f"{func.name}: {func.description}")
+        for param_name, param in func.parameters.properties.items():
+            document_parameter(param_name, param, 1, 0)
+
+    if shared_structures:
+        lines.append("Shared Structures:")
+        for label, structure in dict(shared_structures.values()).items():
+            lines.append(f"{label}:")
+            for field_name, field in structure.items():
+                document_parameter(field_name, field, 1, 1)
+
+    return "\n".join(lines) + "\n"
+
+
 def save_documentation_to_file(documentation, file_path):
     try:
         with open(file_path, 'w') as file:
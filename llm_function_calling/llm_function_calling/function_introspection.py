@@ -0,0 +1,177 @@
+import collections.abc
+import dataclasses
+import functools
+import inspect
+import re
+import types
+import typing
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .function_call import DataType, FrozenFunctionCall, FrozenFunctionParameter, FrozenFunctionParameters
+from .llm_function_caller import LLMFunctionCaller
+
+PRIMITIVE_TYPES = {str: DataType.STRING, bool: DataType.BOOLEAN, int: DataType.NUMBER, float: DataType.FLOAT}
+
+DOCSTRING_SECTION = re.compile(r"^\s*(Args|Arguments|Parameters|Params)\s*:\s*$")
+DOCSTRING_ARGUMENT = re.compile(r"^\s*\*{0,2}(\w+)\s*(?:\([^)]*\))?\s*:\s*(.*)$")
+
+# (path relative to the parameter, class) pairs used to build the class_map of a function
+ClassEntries = Tuple[Tuple[str, type], ...]
+
+
+def _unwrap_optional(annotation) -> Tuple[Any, bool]:
+    """Return the annotation without None and whether None was part of it."""
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union or origin is types.UnionType:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(args) != 1:
+            raise ValueError(f"Union types are not supported: {annotation}")
+        return args[0], len(args) != len(typing.get_args(annotation))
+    return annotation, False
+
+
+def _join_path(prefix: str, path: str) -> str:
+    return f"{prefix}.{path}" if path else prefix
+
+
+@functools.lru_cache(maxsize=None)
+def describe_type(annotation) -> Tuple[FrozenFunctionParameter, ClassEntries]:
+    """
+    Describe a type annotation as a required FrozenFunctionParameter without description, plus the
+    dataclasses and Enums found in it for materialization. Results are cached per annotation, so a
+    dataclass or Enum used by many functions is only inspected once.
+    """
+    annotation, _ = _unwrap_optional(annotation)
+    if annotation in PRIMITIVE_TYPES:
+        return FrozenFunctionParameter(PRIMITIVE_TYPES[annotation], True), ()
+
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        values = [member.value for member in annotation]
+        if not all(isinstance(value, str) for value in values):
+            raise ValueError(f"Only Enums with string values are supported: {annotation.__name__}")
+        return FrozenFunctionParameter(DataType.ENUM, True, enum=values), (("", annotation),)
+
+    if isinstance(annotation, type) and dataclasses.is_dataclass(annotation):
+        structure, entries = describe_fields(dataclass_fields(annotation))
+        return FrozenFunctionParameter(DataType.OBJECT, True, structure=structure), (("", annotation),) + entries
+
+    origin = typing.get_origin(annotation)
+    if origin in (list, collections.abc.Sequence):
+        args = typing.get_args(annotation)
+        if not args:
+            raise ValueError(f"List annotations need an element type: {annotation}")
+        element, entries = describe_type(args[0])
+        return FrozenFunctionParameter(DataType.ARRAY, True, element_type=element), entries
+
+    raise ValueError(f"Unsupported parameter type: {annotation}")
+
+
+def dataclass_fields(cls: type) -> List[Tuple[str, Any, bool, Optional[str]]]:
+    """(name, annotation, required, description) of the init fields of a dataclass."""
+    hints = typing.get_type_hints(cls)
+    fields = []
+    for field in dataclasses.fields(cls):
+        if not field.init:
+            continue
+        has_default = field.default is not dataclasses.MISSING or field.default_factory is not dataclasses.MISSING
+        annotation, optional = _unwrap_optional(hints[field.name])
+        fields.append((field.name, annotation, not (has_default or optional), field.metadata.get("description")))
+    return fields
+
+
+def describe_fields(fields) -> Tuple[Dict[str, FrozenFunctionParameter], ClassEntries]:
+    structure = {}
+    entries = []
+    for name, annotation, required, description in fields:
+        param, nested_entries = describe_type(annotation)
+        structure[name] = FrozenFunctionParameter(param.type, required, description, param.enum, param.structure,
+                                                  param.element_type, param.precision)
+        entries += [(_join_path(name, path), cls) for path, cls in nested_entries]
+    return structure, tuple(entries)
+
+
+def parse_docstring(docstring: Optional[str]) -> Tuple[str, Dict[str, str]]:
+    """Split a docstring into its first paragraph and the argument descriptions of an Args: section."""
+    if not docstring:
+        return "", {}
+    first_paragraph = docstring.strip().split("\n\n")[0]
+    summary = "" if DOCSTRING_SECTION.match(first_paragraph.splitlines()[0]) else \
+        " ".join(line.strip() for line in first_paragraph.splitlines())
+
+    descriptions: Dict[str, str] = {}
+    in_section = False
+    argument_indent = None
+    current = None
+    for line in docstring.splitlines():
+        if DOCSTRING_SECTION.match(line):
+            in_section, argument_indent, current = True, None, None
+            continue
+        if not in_section or not line.strip():
+            continue
+        indent = len(line) - len(line.lstrip())
+        if indent == 0:
+            # Any other section, e.g. Returns:, ends the argument list
+            in_section = False
+            continue
+        if argument_indent is None:
+            argument_indent = indent
+        match = DOCSTRING_ARGUMENT.match(line)
+        if indent == argument_indent and match:
+            current = match.group(1)
+            descriptions[current] = match.group(2).strip()
+        elif indent > argument_indent and current is not None:
+            descriptions[current] = f"{descriptions[current]} {line.strip()}".strip()
+    return summary, descriptions
+
+
+@functools.lru_cache(maxsize=None)
+def introspect_function(function: Callable, name: Optional[str] = None,
+                        description: Optional[str] = None) -> Tuple[FrozenFunctionCall, Dict[str, type]]:
+    """
+    Derive the FunctionCall of a Python function from its signature, type hints and docstring, and the
+    class_map that materializes its dataclass and Enum parameters (see compile_materializer).
+    str, bool, int and float map to string, boolean, number and float, Enums to enum, dataclasses to object
+    and list[...] to array. Parameters with a default value or an Optional type are not required.
+    The summary line of the docstring is the description, and an Args: section describes the parameters.
+    Results are cached per function.
+    """
+    summary, descriptions = parse_docstring(inspect.getdoc(function))
+    hints = typing.get_type_hints(function)
+    fields = []
+    for parameter in inspect.signature(function).parameters.values():
+        if parameter.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD):
+            continue
+        if parameter.name not in hints:
+            raise ValueError(f"Parameter {parameter.name} of {function.__qualname__} has no type annotation")
+        annotation, optional = _unwrap_optional(hints[parameter.name])
+        required = parameter.default is inspect.Parameter.empty and not optional
+        fields.append((parameter.name, annotation, required, descriptions.get(parameter.name)))
+
+    structure, entries = describe_fields(fields)
+    function_call = FrozenFunctionCall(name or function.__name__, description or summary,
+                                       FrozenFunctionParameters(structure))
+    return function_call, dict(entries)
+
+
+def llm_function(caller=None, name: Optional[str] = None, description: Optional[str] = None):
+    """
+    Decorator deriving the FunctionCall of a function with introspect_function. The FunctionCall is stored
+    as the function_call attribute of the function, and if an LLMFunctionCaller is passed, the function is
+    registered with it, including validation and materialization of dataclass and Enum parameters.
+    Can also be used bare, as @llm_function, to only derive the FunctionCall.
+    """
+    def decorate(function):
+        function_call, class_map = introspect_function(function, name, description)
+        function.function_call = function_call
+        if caller is not None:
+            caller.add_function(function_call.name, function, function_call, class_map or None)
+        return function
+
+    if caller is None or isinstance(caller, LLMFunctionCaller):
+        return decorate
+    if callable(caller):
+        # Used without parentheses: caller is the decorated function
+        function, caller = caller, None
+        return decorate(function)
+    raise TypeError(f"llm_function expects an LLMFunctionCaller, got {type(caller).__name__}")
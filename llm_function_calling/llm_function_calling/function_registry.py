@@ -0,0 +1,188 @@
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .function_call import FunctionCall
+from .function_calling_grammar_generator import generate_gbnf_grammar, generate_documentation, \
+    generate_compact_documentation
+from .grammar_cache import fingerprint_function_calls
+from .parameter_validation import compile_validator
+
+
+class FunctionRegistry:
+    """
+    Single owner of a toolset: the FunctionCall schemas, the callables and their validators, indexed by
+    name, tag and namespace. Every change increments version, and the registration-ordered list of
+    definitions, the fingerprint, grammars and documentation are derived once per version.
+
+    The registry is iterable over its FunctionCall definitions, so it can be passed directly to
+    generate_gbnf_grammar or generate_documentation, and LLMFunctionCaller(registry=...) dispatches
+    from its function_map and validators without copying them.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.function_map: Dict[str, Callable] = {}
+        self.validators: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+        self._function_calls: Dict[str, FunctionCall] = {}
+        self._tags: Dict[str, Tuple[str, ...]] = {}
+        self._namespaces: Dict[str, Optional[str]] = {}
+        # Ordered sets (dicts with None values) of names per tag and per namespace
+        self._tag_index: Dict[str, Dict[str, None]] = {}
+        self._namespace_index: Dict[str, Dict[str, None]] = {}
+        self._snapshot: Optional[List[FunctionCall]] = None
+        self._derived: Dict[tuple, Any] = {}
+        self._lock = threading.RLock()
+
+    def register(self, function_call: FunctionCall, function: Optional[Callable] = None,
+                 tags: Iterable[str] = (), namespace: Optional[str] = None) -> int:
+        """
+        Add or replace a function and return the new version. A replaced function keeps its position.
+        Without a callable only the schema is registered, e.g. for grammars of functions executed elsewhere;
+        a callable registered earlier under the same name is kept and validated against the new schema.
+        """
+        name = function_call.name
+        with self._lock:
+            if function is None:
+                function = self.function_map.get(name)
+            validator = compile_validator(function_call) if function is not None else None
+            self._unindex(name)
+            self._function_calls[name] = function_call
+            self._tags[name] = tuple(dict.fromkeys(tags))
+            self._namespaces[name] = namespace
+            for tag in self._tags[name]:
+                self._tag_index.setdefault(tag, {})[name] = None
+            if namespace is not None:
+                self._namespace_index.setdefault(namespace, {})[name] = None
+            if function is not None:
+                self.function_map[name] = function
+                self.validators[name] = validator
+            return self._changed()
+
+    def unregister(self, name: str) -> int:
+        """Remove a function and return the new version. Raises ValueError if it is not registered."""
+        with self._lock:
+            if name not in self._function_calls:
+                raise ValueError(f"Function not defined: {name}")
+            self._unindex(name)
+            del self._function_calls[name]
+            del self._tags[name]
+            del self._namespaces[name]
+            self.function_map.pop(name, None)
+            self.validators.pop(name, None)
+            return self._changed()
+
+    def get(self, name: str) -> Optional[FunctionCall]:
+        return self._function_calls.get(name)
+
+    def get_function(self, name: str) -> Optional[Callable]:
+        return self.function_map.get(name)
+
+    def tags_of(self, name: str) -> Tuple[str, ...]:
+        return self._tags.get(name, ())
+
+    def namespace_of(self, name: str) -> Optional[str]:
+        return self._namespaces.get(name)
+
+    def tags(self) -> List[str]:
+        with self._lock:
+            return list(self._tag_index)
+
+    def namespaces(self) -> List[str]:
+        with self._lock:
+            return list(self._namespace_index)
+
+    def names(self, tag: Optional[str] = None, namespace: Optional[str] = None) -> List[str]:
+        """Names of the functions with tag and in namespace (either may be None to not filter), in index order."""
+        with self._lock:
+            if tag is None and namespace is None:
+                return list(self._function_calls)
+            tagged = self._tag_index.get(tag, {}) if tag is not None else None
+            in_namespace = self._namespace_index.get(namespace, {}) if namespace is not None else None
+            if tagged is None:
+                return list(in_namespace)
+            if in_namespace is None:
+                return list(tagged)
+            return [name for name in tagged if name in in_namespace]
+
+    def function_calls(self, tag: Optional[str] = None, namespace: Optional[str] = None) -> List[FunctionCall]:
+        """
+        FunctionCall definitions filtered like names(). The unfiltered list is built once per version and
+        shared, so treat it as read-only.
+        """
+        if tag is None and namespace is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = list(self._function_calls.values())
+                return self._snapshot
+        with self._lock:
+            return [self._function_calls[name] for name in self.names(tag, namespace)]
+
+    def select(self, names: Iterable[str]) -> List[FunctionCall]:
+        """FunctionCall definitions of names, in the given order. Raises ValueError for unknown names."""
+        names = list(names)
+        with self._lock:
+            selected = [self._function_calls.get(name) for name in names]
+        if None in selected:
+            unknown = [name for name, function_call in zip(names, selected) if function_call is None]
+            raise ValueError(f"Function not defined: {', '.join(unknown)}")
+        return selected
+
+    def fingerprint(self) -> str:
+        """Schema fingerprint of all definitions (see fingerprint_function_calls), computed once per version."""
+        return self._derive(("fingerprint",), lambda: fingerprint_function_calls(self.function_calls()))
+
+    def generate_grammar(self, tag: Optional[str] = None, namespace: Optional[str] = None,
+                         **grammar_options) -> str:
+        """generate_gbnf_grammar for the functions filtered like names(), memoized until the next change."""
+        key = ("grammar", tag, namespace, tuple(sorted(grammar_options.items())))
+        return self._derive(key, lambda: generate_gbnf_grammar(self.function_calls(tag, namespace),
+                                                               **grammar_options))
+
+    def generate_documentation(self, tag: Optional[str] = None, namespace: Optional[str] = None,
+                               compact: bool = False, max_length: Optional[int] = None) -> str:
+        """Full or compact documentation for the functions filtered like names(), memoized until the next change."""
+        key = ("documentation", tag, namespace, compact, max_length)
+        if compact:
+            return self._derive(key, lambda: generate_compact_documentation(self.function_calls(tag, namespace),
+                                                                            max_length))
+        return self._derive(key, lambda: generate_documentation(self.function_calls(tag, namespace)))
+
+    def __len__(self) -> int:
+        return len(self._function_calls)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._function_calls
+
+    def __iter__(self) -> Iterator[FunctionCall]:
+        return iter(self.function_calls())
+
+    def _derive(self, key: tuple, build: Callable[[], Any]) -> Any:
+        with self._lock:
+            version = self.version
+            if key in self._derived:
+                return self._derived[key]
+        value = build()
+        with self._lock:
+            # Only keep the result if nothing changed while it was built
+            if version == self.version:
+                self._derived[key] = value
+        return value
+
+    def _unindex(self, name: str) -> None:
+        for tag in self._tags.get(name, ()):
+            names = self._tag_index[tag]
+            del names[name]
+            if not names:
+                del self._tag_index[tag]
+        namespace = self._namespaces.get(name)
+        if namespace is not None:
+            names = self._namespace_index[namespace]
+            del names[name]
+            if not names:
+                del self._namespace_index[namespace]
+
+    def _changed(self) -> int:
+        self.version += 1
+        self._snapshot = None
+        self._derived.clear()
+        return self.version
@@ -0,0 +1,308 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+RULE_START = re.compile(r"^\s*([a-zA-Z0-9-]+)\s*::=(.*)$")
+TOKEN = re.compile(r'\s*("(?:\\.|[^"\\])*"|\[(?:\\.|[^\]\\])*\]|[a-zA-Z0-9-]+|[()|?*+])')
+
+
+class Symbol:
+    """A single element of a rule body: a literal, a character class, a rule reference or a group."""
+
+    def __init__(self, kind: str, value, repeat: str = ""):
+        self.kind = kind      # "literal", "class", "ref" or "group"
+        self.value = value    # text for literal/class, rule name for ref, list of alternatives for group
+        self.repeat = repeat  # "", "?", "*" or "+"
+
+
+def tokenize_rule_body(body: str) -> List[str]:
+    tokens = []
+    position = 0
+    body = body.rstrip()
+    while position < len(body):
+        if body[position].isspace():
+            position += 1
+            continue
+        if body[position] == "#":
+            break
+        match = TOKEN.match(body, position)
+        if match is None:
+            raise ValueError(f"Cannot parse grammar near: {body[position:position + 30]!r}")
+        tokens.append(match.group(1))
+        position = match.end()
+    return tokens
+
+
+def parse_alternatives(tokens: List[str], position: int = 0) -> Tuple[List[List[Symbol]], int]:
+    alternatives = []
+    sequence, position = parse_sequence(tokens, position)
+    alternatives.append(sequence)
+    while position < len(tokens) and tokens[position] == "|":
+        sequence, position = parse_sequence(tokens, position + 1)
+        alternatives.append(sequence)
+    return alternatives, position
+
+
+def parse_sequence(tokens: List[str], position: int) -> Tuple[List[Symbol], int]:
+    sequence = []
+    while position < len(tokens) and tokens[position] not in ("|", ")"):
+        token = tokens[position]
+        if token == "(":
+            group, position = parse_alternatives(tokens, position + 1)
+            if position >= len(tokens) or tokens[position] != ")":
+                raise ValueError("Unbalanced parentheses in grammar")
+            symbol = Symbol("group", group)
+        elif token.startswith('"'):
+            symbol = Symbol("literal", token)
+        elif token.startswith("["):
+            symbol = Symbol("class", token)
+        elif token in ("?", "*", "+"):
+            raise ValueError(f"Unexpected repetition operator {token!r}")
+        else:
+            symbol = Symbol("ref", token)
+        position += 1
+        if position < len(tokens) and tokens[position] in ("?", "*", "+"):
+            symbol.repeat = tokens[position]
+            position += 1
+        sequence.append(symbol)
+    return sequence, position
+
+
+def parse_gbnf_rules(grammar: str) -> Dict[str, str]:
+    """
+    Split a GBNF grammar into rule bodies by name. Lines that do not start a new rule are treated as
+    a continuation of the previous one; later definitions of the same rule are added as alternatives.
+    """
+    rules: Dict[str, str] = {}
+    current = None
+    for line in grammar.split("\n"):
+        match = RULE_START.match(line)
+        if match:
+            current = match.group(1)
+            body = match.group(2).strip()
+            rules[current] = f"{rules[current]} | {body}" if current in rules else body
+        elif current is not None and line.strip() and not line.strip().startswith("#"):
+            rules[current] += " " + line.strip()
+    return rules
+
+
+class GrammarComplexityReport:
+    """Structured result of analyze_grammar."""
+
+    def __init__(self, rule_count: int, max_alternation_fanout: int, max_fanout_rule: Optional[str],
+                 nesting_depth: int, max_group_depth: int, largest_enums: List[Tuple[str, int]],
+                 duplicated_rule_bodies: List[List[str]], initial_stack_count: int,
+                 estimated_worst_case_stacks: int, worst_case_rule: Optional[str],
+                 undefined_rules: List[str], grammar_bytes: int):
+        self.rule_count = rule_count
+        self.max_alternation_fanout = max_alternation_fanout
+        self.max_fanout_rule = max_fanout_rule
+        self.nesting_depth = nesting_depth
+        self.max_group_depth = max_group_depth
+        self.largest_enums = largest_enums
+        self.duplicated_rule_bodies = duplicated_rule_bodies
+        self.initial_stack_count = initial_stack_count
+        self.estimated_worst_case_stacks = estimated_worst_case_stacks
+        self.worst_case_rule = worst_case_rule
+        self.undefined_rules = undefined_rules
+        self.grammar_bytes = grammar_bytes
+
+    def to_dict(self) -> dict:
+        return {
+            "rule_count": self.rule_count,
+            "grammar_bytes": self.grammar_bytes,
+            "max_alternation_fanout": self.max_alternation_fanout,
+            "max_fanout_rule": self.max_fanout_rule,
+            "nesting_depth": self.nesting_depth,
+            "max_group_depth": self.max_group_depth,
+            "largest_enums": [{"rule": name, "values": count} for name, count in self.largest_enums],
+            "duplicated_rule_bodies": self.duplicated_rule_bodies,
+            "initial_stack_count": self.initial_stack_count,
+            "estimated_worst_case_stacks": self.estimated_worst_case_stacks,
+            "worst_case_rule": self.worst_case_rule,
+            "undefined_rules": self.undefined_rules,
+        }
+
+    def format(self) -> str:
+        lines = [
+            f"Rules: {self.rule_count} ({self.grammar_bytes} bytes)",
+            f"Max alternation fan-out: {self.max_alternation_fanout} (in {self.max_fanout_rule})",
+            f"Rule nesting depth from root: {self.nesting_depth}",
+            f"Max group nesting depth: {self.max_group_depth}",
+            f"Grammar stacks at start of generation: {self.initial_stack_count}",
+            f"Estimated worst-case stacks: {self.estimated_worst_case_stacks} (entering {self.worst_case_rule})",
+            "Largest enums:",
+        ]
+        lines += [f"  {name}: {count} values" for name, count in self.largest_enums] or ["  none"]
+        lines.append("Duplicated rule bodies:")
+        lines += [f"  {', '.join(names)}" for names in self.duplicated_rule_bodies] or ["  none"]
+        if self.undefined_rules:
+            lines.append(f"Undefined rules: {', '.join(self.undefined_rules)}")
+        return "\n".join(lines)
+
+
+class GrammarAnalyzer:
+    def __init__(self, grammar: str, root: str = "root"):
+        self.grammar = grammar
+        self.root = root
+        self.rule_bodies = parse_gbnf_rules(grammar)
+        self.rules = {name: parse_alternatives(tokenize_rule_body(body))[0] for name, body in self.rule_bodies.items()}
+        self._stack_counts: Dict[str, int] = {}
+        self._stack_in_progress = set()
+
+    def analyze(self, top_n: int = 5) -> GrammarComplexityReport:
+        max_fanout, max_fanout_rule, max_group_depth = 0, None, 0
+        for name, alternatives in self.rules.items():
+            fanout, group_depth = self._alternation_stats(alternatives)
+            if fanout > max_fanout:
+                max_fanout, max_fanout_rule = fanout, name
+            max_group_depth = max(max_group_depth, group_depth)
+
+        enums = []
+        for name, alternatives in self.rules.items():
+            count = self._literal_count(alternatives)
+            if count is not None and count > 1:
+                enums.append((name, count))
+        enums.sort(key=lambda item: item[1], reverse=True)
+
+        bodies: Dict[str, List[str]] = {}
+        for name, body in self.rule_bodies.items():
+            bodies.setdefault(" ".join(tokenize_rule_body(body)), []).append(name)
+        duplicates = [names for names in bodies.values() if len(names) > 1]
+
+        reachable = self._reachable_rules()
+        worst_stacks, worst_rule = 0, None
+        for name in reachable:
+            stacks = self._rule_stack_count(name)
+            if stacks > worst_stacks:
+                worst_stacks, worst_rule = stacks, name
+
+        undefined = sorted({symbol.value for alternatives in self.rules.values()
+                            for symbol in self._walk_symbols(alternatives)
+                            if symbol.kind == "ref" and symbol.value not in self.rules})
+
+        return GrammarComplexityReport(
+            rule_count=len(self.rules),
+            max_alternation_fanout=max_fanout,
+            max_fanout_rule=max_fanout_rule,
+            nesting_depth=self._nesting_depth(),
+            max_group_depth=max_group_depth,
+            largest_enums=enums[:top_n],
+            duplicated_rule_bodies=duplicates,
+            initial_stack_count=self._rule_stack_count(self.root) if self.root in self.rules else 0,
+            estimated_worst_case_stacks=worst_stacks,
+            worst_case_rule=worst_rule,
+            undefined_rules=undefined,
+            grammar_bytes=len(self.grammar.encode("utf-8")),
+        )
+
+    def _walk_symbols(self, alternatives):
+        for sequence in alternatives:
+            for symbol in sequence:
+                yield symbol
+                if symbol.kind == "group":
+                    yield from self._walk_symbols(symbol.value)
+
+    def _alternation_stats(self, alternatives, depth: int = 0) -> Tuple[int, int]:
+        fanout, max_depth = len(alternatives), depth
+        for sequence in alternatives:
+            for symbol in sequence:
+                if symbol.kind == "group":
+                    group_fanout, group_depth = self._alternation_stats(symbol.value, depth + 1)
+                    fanout, max_depth = max(fanout, group_fanout), max(max_depth, group_depth)
+        return fanout, max_depth
+
+    def _literal_count(self, alternatives) -> Optional[int]:
+        """
+        Number of distinct literal strings an enum-like body starts with, or None if an alternative
+        does not start with a literal. Symbols following the literal prefix are ignored.
+        """
+        total = 0
+        for sequence in alternatives:
+            product = 0
+            for symbol in sequence:
+                count = None
+                if symbol.repeat not in ("*", "+"):
+                    if symbol.kind == "literal":
+                        count = 1
+                    elif symbol.kind == "group":
+                        count = self._literal_count(symbol.value)
+                if count is None:
+                    break
+                product = max(product, 1) * (count + 1 if symbol.repeat == "?" else count)
+            if product == 0:
+                return None
+            total += product
+        return total
+
+    def _reachable_rules(self) -> List[str]:
+        if self.root not in self.rules:
+            return list(self.rules)
+        seen, pending = {self.root}, [self.root]
+        while pending:
+            for symbol in self._walk_symbols(self.rules[pending.pop()]):
+                if symbol.kind == "ref" and symbol.value in self.rules and symbol.value not in seen:
+                    seen.add(symbol.value)
+                    pending.append(symbol.value)
+        return [name for name in self.rules if name in seen]
+
+    def _nesting_depth(self) -> int:
+        """Length of the longest chain of rule references from the root, ignoring recursive references."""
+        depths: Dict[str, int] = {}
+        in_progress = set()
+
+        def depth(name):
+            if name in depths:
+                return depths[name]
+            if name in in_progress or name not in self.rules:
+                return 0
+            in_progress.add(name)
+            children = [depth(symbol.value) for symbol in self._walk_symbols(self.rules[name]) if symbol.kind == "ref"]
+            in_progress.discard(name)
+            depths[name] = 1 + max(children, default=0)
+            return depths[name]
+
+        return depth(self.root) if self.root in self.rules else max((depth(name) for name in self.rules), default=0)
+
+    def _rule_stack_count(self, name: str) -> int:
+        """
+        Number of parser stacks llama.cpp keeps after entering a rule: every alternative is expanded until a
+        terminal is on top, so each literal or character class that can start the rule accounts for one stack.
+        """
+        if name in self._stack_counts:
+            return self._stack_counts[name]
+        if name in self._stack_in_progress or name not in self.rules:
+            return 1
+        self._stack_in_progress.add(name)
+        count = self._alternatives_stack_count(self.rules[name])
+        self._stack_in_progress.discard(name)
+        self._stack_counts[name] = count
+        return count
+
+    def _alternatives_stack_count(self, alternatives) -> int:
+        total = 0
+        for sequence in alternatives:
+            total += self._sequence_stack_count(sequence)
+        return max(total, 1)
+
+    def _sequence_stack_count(self, sequence) -> int:
+        count = 0
+        for symbol in sequence:
+            if symbol.kind in ("literal", "class"):
+                first = 1
+            elif symbol.kind == "group":
+                first = self._alternatives_stack_count(symbol.value)
+            else:
+                first = self._rule_stack_count(symbol.value)
+            count += first
+            # Optional symbols also leave a stack for whatever follows them
+            if symbol.repeat not in ("?", "*"):
+                return count
+        return max(count, 1)
+
+
+def analyze_grammar(grammar: str, top_n: int = 5, root: str = "root") -> GrammarComplexityReport:
+    """
+    Analyze a GBNF grammar, e.g. the output of generate_gbnf_grammar, and report its rule count, maximum
+    alternation fan-out, nesting depth, largest enums, duplicated rule bodies and estimated grammar stacks.
+    """
+    return GrammarAnalyzer(grammar, root).analyze(top_n)
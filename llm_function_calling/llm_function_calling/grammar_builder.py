@@ -0,0 +1,102 @@
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from .function_call import FunctionCall
+from .function_calling_grammar_generator import generate_gbnf_rule, collect_float_precisions, \
+    format_rule_name, assemble_gbnf_grammar, generate_root_rule, RuleInterner, ENUM_TRIE_THRESHOLD
+
+
+class FunctionRules:
+    """The generated rule block of a single FunctionCall, as kept by GrammarBuilder."""
+
+    def __init__(self, rule_name: str, function_rule: str, param_rules: str, float_precisions: set,
+                 shared_rules: Optional[Dict[str, str]] = None):
+        self.rule_name = rule_name
+        self.function_rule = function_rule
+        self.param_rules = param_rules
+        self.float_precisions = float_precisions
+        self.shared_rules = shared_rules or {}
+
+
+class GrammarBuilder:
+    """
+    Stateful GBNF grammar builder for toolsets that change one function at a time.
+    The rules of every FunctionCall are generated once when it is added; adding, replacing or removing
+    a function only regenerates that function's rules, and build() reassembles the root alternation.
+    build() returns the same grammar as generate_gbnf_grammar for the current functions in insertion order.
+    With intern_rules=True, interned object, array and enum rules are reference counted across functions.
+    """
+
+    def __init__(self, function_calls: Optional[Iterable[FunctionCall]] = None, intern_rules: bool = False,
+                 factor_prefixes: bool = True, enum_trie_threshold: Optional[int] = ENUM_TRIE_THRESHOLD,
+                 multi_call: bool = False, max_calls: Optional[int] = None):
+        self.intern_rules = intern_rules
+        self.factor_prefixes = factor_prefixes
+        self.enum_trie_threshold = enum_trie_threshold
+        self.multi_call = multi_call
+        self.max_calls = max_calls
+        self._function_rules: "OrderedDict[str, FunctionRules]" = OrderedDict()
+        self._float_precision_counts: Counter = Counter()
+        self._shared_rules: Dict[str, str] = {}
+        self._shared_rule_counts: Counter = Counter()
+        self._grammar: Optional[str] = None
+        for function_call in function_calls or []:
+            self.add_function_call(function_call)
+
+    def add_function_call(self, function_call: FunctionCall) -> None:
+        """Add a FunctionCall, replacing an existing one with the same name in place."""
+        if self.intern_rules:
+            interner = RuleInterner(self.enum_trie_threshold)
+            function_rule, param_rules = generate_gbnf_rule(function_call, interner)
+            rules = FunctionRules(format_rule_name(function_call.name), function_rule, param_rules,
+                                  interner.float_precisions, interner.rules)
+        else:
+            function_rule, param_rules = generate_gbnf_rule(function_call, enum_trie_threshold=self.enum_trie_threshold)
+            rules = FunctionRules(format_rule_name(function_call.name), function_rule, param_rules,
+                                  collect_float_precisions([function_call]))
+
+        previous = self._function_rules.get(function_call.name)
+        if previous is not None:
+            self._release(previous)
+        self._float_precision_counts.update(rules.float_precisions)
+        self._shared_rule_counts.update(rules.shared_rules.keys())
+        self._shared_rules.update(rules.shared_rules)
+        self._function_rules[function_call.name] = rules
+        self._grammar = None
+
+    def remove_function_call(self, name: str) -> None:
+        """Remove the FunctionCall with the given name. Raises KeyError if it was never added."""
+        rules = self._function_rules.pop(name)
+        self._release(rules)
+        self._grammar = None
+
+    def function_names(self) -> List[str]:
+        return list(self._function_rules)
+
+    def build(self) -> str:
+        """Return the complete grammar, reusing the last result if nothing changed since."""
+        if self._grammar is None:
+            blocks = self._function_rules.values()
+            float_precisions = {precision for precision, count in self._float_precision_counts.items() if count > 0}
+            shared_rules = [f"{rule_name} ::= {self._shared_rules[rule_name]}" for rule_name in sorted(self._shared_rules)]
+            root_rule = generate_root_rule(self._function_rules.keys(), self.factor_prefixes,
+                                           self.multi_call, self.max_calls)
+            function_rules = [] if self.factor_prefixes else [rules.function_rule for rules in blocks]
+            self._grammar = assemble_gbnf_grammar(root_rule, function_rules,
+                                                  [rules.param_rules for rules in blocks],
+                                                  float_precisions, shared_rules)
+        return self._grammar
+
+    def _release(self, rules: FunctionRules) -> None:
+        self._float_precision_counts.subtract(rules.float_precisions)
+        for rule_name in rules.shared_rules:
+            self._shared_rule_counts[rule_name] -= 1
+            if self._shared_rule_counts[rule_name] <= 0:
+                del self._shared_rule_counts[rule_name]
+                del self._shared_rules[rule_name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._function_rules
+
+    def __len__(self) -> int:
+        return len(self._function_rules)
@@ -0,0 +1,345 @@
+import contextlib
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import IO, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from .function_call import FunctionCall, FrozenFunctionCall
+from .function_calling_grammar_generator import generate_gbnf_grammar, append_primitive_grammar, \
+    generate_documentation, generate_compact_documentation, GRAMMAR_FORMAT_VERSION
+
+
+@contextlib.contextmanager
+def atomic_write(file_path: str, mode: str = 'w') -> Iterator[IO]:
+    """
+    Open a temporary file in the directory of file_path and move it over file_path when the block exits,
+    so concurrent readers see either the previous or the complete new file. The temporary file is removed
+    if the block raises or is interrupted. mode is 'w' for UTF-8 text or 'wb' for bytes.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(file_path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, encoding=None if "b" in mode else "utf-8") as file:
+            yield file
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+def fingerprint_function_calls(function_calls: List[FunctionCall]) -> str:
+    """
+    Return a stable SHA-256 fingerprint of a list of FunctionCall instances.
+    The fingerprint only depends on the content and order of the definitions, so it is
+    the same across processes and can be used as an on-disk cache key.
+    Fingerprints of toolsets made only of FrozenFunctionCall instances are memoized by the toolset itself.
+    """
+    if all(type(function_call) is FrozenFunctionCall for function_call in function_calls):
+        return _fingerprint_frozen_function_calls(tuple(function_calls))
+    return _fingerprint_function_calls(function_calls)
+
+
+@functools.lru_cache(maxsize=1024)
+def _fingerprint_frozen_function_calls(function_calls: Tuple[FrozenFunctionCall, ...]) -> str:
+    return _fingerprint_function_calls(function_calls)
+
+
+def _fingerprint_function_calls(function_calls) -> str:
+    canonical = json.dumps([function_call.to_dict() for function_call in function_calls],
+                           separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _resolve_toolset(function_calls) -> Tuple[Optional[Hashable], List[FunctionCall]]:
+    """
+    Return the in-memory cache key and the definitions of a toolset. A FunctionRegistry is keyed by its
+    fingerprint, which it computes once per version, and a toolset of FrozenFunctionCall instances by the
+    tuple of its definitions, whose hashes are precomputed. Mutable definitions can change at any time,
+    so lists of them have no cheap key and None is returned.
+    """
+    if hasattr(function_calls, "fingerprint"):
+        # Retry until the fingerprint and the definitions belong to the same registry version
+        while True:
+            version = function_calls.version
+            fingerprint = function_calls.fingerprint()
+            definitions = function_calls.function_calls()
+            if function_calls.version == version:
+                return fingerprint, definitions
+    if all(type(function_call) is FrozenFunctionCall for function_call in function_calls):
+        return tuple(function_calls), function_calls
+    return None, function_calls
+
+
+class GrammarCache:
+    """
+    Content-addressed cache for complete GBNF grammars (primitive rules included).
+    Grammars are kept in an in-process LRU and, if cache_dir is set, also stored on disk
+    as <fingerprint>.gbnf so other processes and restarts can reuse them. The SHA-256 fingerprint is only
+    computed on a miss when the toolset is a FunctionRegistry or made of FrozenFunctionCall instances;
+    lists of mutable FunctionCall instances are hashed on every lookup.
+    Additional keyword arguments are passed on to generate_gbnf_grammar (e.g. intern_rules=True)
+    and, together with GRAMMAR_FORMAT_VERSION, are part of the on-disk cache key.
+    """
+
+    def __init__(self, max_size: int = 128, cache_dir: Optional[str] = None, **grammar_options):
+        self.max_size = max_size
+        self.cache_dir = cache_dir
+        self.grammar_options = grammar_options
+        options = json.dumps([GRAMMAR_FORMAT_VERSION, sorted(grammar_options.items())], separators=(",", ":"))
+        self._options_suffix = "-" + hashlib.sha256(options.encode("utf-8")).hexdigest()[:8]
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def get_grammar(self, function_calls: List[FunctionCall], fingerprint: Optional[str] = None) -> str:
+        """
+        Return the finished grammar for function_calls, a list of FunctionCall instances or a FunctionRegistry,
+        generating it only on a miss. Pass a precomputed fingerprint to skip hashing mutable definitions.
+        """
+        if fingerprint is not None:
+            key = fingerprint
+        else:
+            key, function_calls = _resolve_toolset(function_calls)
+            if key is None:
+                key = _fingerprint_function_calls(function_calls)
+        grammar = self._lookup_memory(key)
+        if grammar is not None:
+            return grammar
+
+        if fingerprint is None:
+            fingerprint = key if isinstance(key, str) else fingerprint_function_calls(function_calls)
+        grammar = self._read_from_disk(fingerprint)
+        if grammar is not None:
+            with self._lock:
+                self.disk_hits += 1
+                self._remember(key, grammar)
+            return grammar
+
+        grammar = append_primitive_grammar(generate_gbnf_grammar(function_calls, **self.grammar_options))
+        with self._lock:
+            self.misses += 1
+            self._remember(key, grammar)
+        self._write_to_disk(fingerprint, grammar)
+        return grammar
+
+    def lookup(self, fingerprint: str) -> Optional[str]:
+        """Return the cached grammar for a fingerprint or None, checking memory before disk."""
+        grammar = self._lookup_memory(fingerprint)
+        if grammar is not None:
+            return grammar
+
+        grammar = self._read_from_disk(fingerprint)
+        if grammar is not None:
+            with self._lock:
+                self.disk_hits += 1
+                self._remember(fingerprint, grammar)
+        return grammar
+
+    def store(self, fingerprint: str, grammar: str) -> None:
+        with self._lock:
+            self._remember(fingerprint, grammar)
+        self._write_to_disk(fingerprint, grammar)
+
+    def clear(self) -> None:
+        """Drop all in-memory entries and reset the counters. Files in cache_dir are kept."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.disk_hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+    def _lookup_memory(self, key: Hashable) -> Optional[str]:
+        with self._lock:
+            grammar = self._entries.get(key)
+            if grammar is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return grammar
+
+    def _remember(self, key: Hashable, grammar: str) -> None:
+        self._entries[key] = grammar
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _cache_path(self, fingerprint: str) -> str:
+        return os.path.join(self.cache_dir, f"{fingerprint}{self._options_suffix}.gbnf")
+
+    def _read_from_disk(self, fingerprint: str) -> Optional[str]:
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._cache_path(fingerprint), 'r', encoding='utf-8') as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_to_disk(self, fingerprint: str, grammar: str) -> None:
+        if self.cache_dir is None:
+            return
+        with atomic_write(self._cache_path(fingerprint)) as file:
+            file.write(grammar)
+
+
+class DocumentationCache:
+    """
+    In-process LRU of rendered documentation, keyed by toolset, rendering mode and budget.
+    Toolsets are keyed like in GrammarCache, so hits for a FunctionRegistry or FrozenFunctionCall instances
+    do not serialize the definitions. Fingerprinting a list of mutable FunctionCall instances costs about as
+    much as rendering it, so such lists need a precomputed fingerprint.
+    length_function measures the budget, e.g. a tokenizer's token count; it defaults to characters.
+    """
+
+    def __init__(self, max_size: int = 128, length_function=len):
+        self.max_size = max_size
+        self.length_function = length_function
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_documentation(self, function_calls: List[FunctionCall], compact: bool = True,
+                          max_length: Optional[int] = None, fingerprint: Optional[str] = None) -> str:
+        """
+        Return the documentation of function_calls, rendering it only on a miss. function_calls is a
+        FunctionRegistry, a list of FrozenFunctionCall instances, or any list of FunctionCall instances
+        together with its fingerprint (see fingerprint_function_calls). Raises ValueError for a list of
+        mutable definitions without fingerprint.
+        """
+        if fingerprint is not None:
+            toolset_key = fingerprint
+        else:
+            toolset_key, function_calls = _resolve_toolset(function_calls)
+            if toolset_key is None:
+                raise ValueError("Mutable FunctionCall lists need a fingerprint; "
+                                 "pass one, a FunctionRegistry or frozen definitions")
+        key = (toolset_key, compact, max_length)
+        with self._lock:
+            documentation = self._entries.get(key)
+            if documentation is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return documentation
+
+        if compact:
+            documentation = generate_compact_documentation(function_calls, max_length, self.length_function)
+        else:
+            documentation = generate_documentation(function_calls)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = documentation
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return documentation
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "max_size": self.max_size}
+
+
+class ToolsetSubset:
+    """Grammar (primitive rules included) and documentation for a subset of a registry."""
+
+    def __init__(self, function_names: Tuple[str, ...], grammar: str, documentation: str):
+        self.function_names = function_names
+        self.grammar = grammar
+        self.documentation = documentation
+
+
+def generate_subset_grammar_and_documentation(function_calls: List[FunctionCall], function_names: Iterable[str],
+                                              **grammar_options) -> ToolsetSubset:
+    """Build grammar and documentation for the selected functions, keeping the order of function_calls."""
+    return SubsetGrammarPool(function_calls, max_size=0, **grammar_options).get_subset(function_names)
+
+
+class SubsetGrammarPool:
+    """
+    Per-request grammars and documentation for subsets of a large function registry.
+    Results are memoized in a bounded LRU keyed by the set of selected names, so frequent
+    combinations are only built once. Functions keep their registry order in every subset.
+    """
+
+    def __init__(self, function_calls: List[FunctionCall], max_size: int = 64, **grammar_options):
+        self.max_size = max_size
+        self.grammar_options = grammar_options
+        self.hits = 0
+        self.misses = 0
+        self._function_calls: Dict[str, FunctionCall] = {}
+        self._positions: Dict[str, int] = {}
+        self._next_position = 0
+        self._entries: "OrderedDict[frozenset, ToolsetSubset]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        for function_call in function_calls:
+            self._add(function_call)
+
+    def get_subset(self, function_names: Iterable[str]) -> ToolsetSubset:
+        key = frozenset(function_names)
+        with self._lock:
+            subset = self._entries.get(key)
+            if subset is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return subset
+            unknown = key.difference(self._function_calls)
+            if unknown:
+                raise ValueError(f"Function not defined: {', '.join(sorted(unknown))}")
+            selected = [self._function_calls[name] for name in sorted(key, key=self._positions.__getitem__)]
+            generation = self._generation
+
+        subset = ToolsetSubset(tuple(function_call.name for function_call in selected),
+                               append_primitive_grammar(generate_gbnf_grammar(selected, **self.grammar_options)),
+                               generate_documentation(selected))
+        with self._lock:
+            self.misses += 1
+            # Skip storing if a function was updated or removed while the subset was built
+            if self.max_size > 0 and generation == self._generation:
+                self._entries[key] = subset
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return subset
+
+    def update_function_call(self, function_call: FunctionCall) -> None:
+        """Add or replace a function in the registry and drop every cached subset that contains it."""
+        with self._lock:
+            self._add(function_call)
+            self._invalidate(function_call.name)
+
+    def remove_function_call(self, name: str) -> None:
+        with self._lock:
+            del self._function_calls[name]
+            del self._positions[name]
+            self._invalidate(name)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "max_size": self.max_size}
+
+    def _add(self, function_call: FunctionCall) -> None:
+        if function_call.name not in self._positions:
+            self._positions[function_call.name] = self._next_position
+            self._next_position += 1
+        self._function_calls[function_call.name] = function_call
+
+    def _invalidate(self, name: str) -> None:
+        self._generation += 1
+        for key in [key for key in self._entries if name in key]:
+            del self._entries[key]
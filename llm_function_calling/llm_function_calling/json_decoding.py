@@ -0,0 +1,56 @@
+import json
+from typing import Any, Callable, Dict, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+JsonDecoder = Callable[[Union[str, bytes]], Any]
+
+# Backends in order of preference when none is requested explicitly
+JSON_BACKENDS = ["orjson", "msgspec", "json"]
+
+
+def _msgspec_decoder() -> JsonDecoder:
+    decode = msgspec.json.decode
+
+    def decode_json(text):
+        try:
+            return decode(text)
+        except msgspec.DecodeError as e:
+            # Raise the same exception type as the other backends
+            raise ValueError(str(e)) from e
+    return decode_json
+
+
+def available_json_backends() -> Dict[str, bool]:
+    return {"orjson": orjson is not None, "msgspec": msgspec is not None, "json": True}
+
+
+def get_json_decoder(backend: Optional[str] = None) -> JsonDecoder:
+    """
+    Return a function decoding a JSON str or bytes. backend is "orjson", "msgspec" or "json"; by default the
+    fastest installed backend is used, falling back to the standard library. All backends raise a ValueError
+    on invalid input. Note that orjson and msgspec reject integers that do not fit in 64 bits, and NaN and
+    Infinity literals, which the standard library accepts.
+    """
+    if backend is None:
+        installed = available_json_backends()
+        backend = next(name for name in JSON_BACKENDS if installed[name])
+    if backend == "orjson":
+        if orjson is None:
+            raise ValueError("JSON backend orjson is not installed")
+        return orjson.loads
+    if backend == "msgspec":
+        if msgspec is None:
+            raise ValueError("JSON backend msgspec is not installed")
+        return _msgspec_decoder()
+    if backend == "json":
+        return json.loads
+    raise ValueError(f"Unknown JSON backend: {backend}")
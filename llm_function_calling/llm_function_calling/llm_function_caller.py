@@ -1,36 +1,467 @@
-import json
+import asyncio
+import functools
+import inspect
 import logging
-from typing import Callable, Dict, Any
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Any, Iterable, List, Optional, Sequence, Tuple
+
+from .call_metrics import CallMetrics, DEFAULT_LATENCY_BUCKETS, MetricsExporter
+from .function_call import FunctionCall
+from .function_registry import FunctionRegistry
+from .json_decoding import get_json_decoder
+from .parameter_materialization import compile_materializer
+from .parameter_validation import compile_validator
+from .process_execution import ProcessFunction, resolve_function_reference, warm_up_worker
+from .result_cache import ResultCache, canonicalize_params
+from .streaming_call_parser import CallEvent, StreamingCallParser
+
+
+class CallResult:
+    """Outcome of one call of a batch: the returned value, or the exception raised while parsing or executing it."""
+
+    def __init__(self, index: int, value: Any = None, error: Optional[Exception] = None):
+        self.index = index
+        self.value = value
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        if self.ok:
+            return f"CallResult(index={self.index}, value={self.value!r})"
+        return f"CallResult(index={self.index}, error={self.error!r})"
 
 
 class LLMFunctionCaller:
-    def __init__(self):
-        self.function_map: Dict[str, Callable] = {}
+    def __init__(self, max_workers: Optional[int] = None, json_backend: Optional[str] = None,
+                 process_workers: Optional[int] = None, registry: Optional[FunctionRegistry] = None,
+                 process_start_method: Optional[str] = None):
+        """
+        max_workers bounds the thread pool that execute_function_async and execute_many run synchronous
+        functions on. The pool is created on first use; None uses the ThreadPoolExecutor default.
+        process_workers is the size of the process pool used by functions added with add_process_function
+        (None: one per CPU).
+        process_start_method starts the pool workers with "forkserver", "spawn" or "fork"; by default
+        forkserver where available and spawn elsewhere. See _process_context for what this requires of scripts.
+        json_backend selects the JSON decoder ("orjson", "msgspec" or "json"); by default the fastest
+        installed one is used. json_decoder can also be replaced by any callable afterwards.
+        With a FunctionRegistry, calls are dispatched from the registry's function_map and validators, so
+        functions registered there are callable right away, and add_function with a FunctionCall registers
+        the function in the registry.
+        """
+        self.registry = registry
+        if registry is not None:
+            self.function_map: Dict[str, Callable] = registry.function_map
+            self.validators: Dict[str, Callable[[Dict[str, Any]], None]] = registry.validators
+        else:
+            self.function_map = {}
+            self.validators = {}
         self.param_transformers: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {}
+        self.concurrency_limits: Dict[str, int] = {}
+        self.prewarm_hooks: Dict[str, Callable[[], None]] = {}
+        self.result_caches: Dict[str, ResultCache] = {}
+        self.metrics: Optional[CallMetrics] = None
+        self.max_workers = max_workers
+        self.process_workers = process_workers
+        self.process_start_method = process_start_method
+        self.json_decoder = get_json_decoder(json_backend)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
         logging.basicConfig(level=logging.INFO)
 
-    def add_function(self, name: str, function: Callable) -> None:
-        self.function_map[name] = function
+    def add_function(self, name: str, function: Callable, function_call: Optional[FunctionCall] = None,
+                     class_map: Optional[Dict[str, type]] = None) -> None:
+        """
+        Register a function. If its FunctionCall is given, a validator is compiled once from the schema and
+        the params of every call are checked against it before the function is invoked. With a registry,
+        the FunctionCall is required, must have the same name and the function is added to the registry.
+        With a class_map (see compile_materializer), a converter turning nested params into these classes
+        and Enums is compiled as well and registered as the param transformer of the function.
+        """
+        if class_map is not None and function_call is None:
+            raise ValueError("class_map requires the FunctionCall of the function")
+        if self.registry is not None:
+            if function_call is None:
+                raise ValueError(f"Function {name} needs its FunctionCall to be added to the registry")
+            if function_call.name != name:
+                raise ValueError(f"Function {name} is registered with the FunctionCall of {function_call.name}")
+            # The registry stores the function and compiles its validator
+            self.registry.register(function_call, function)
+        elif function_call is not None:
+            self.function_map[name] = function
+            self.validators[name] = compile_validator(function_call)
+        else:
+            self.function_map[name] = function
+            self.validators.pop(name, None)
+        if class_map is not None:
+            self.param_transformers[name] = compile_materializer(function_call, class_map)
+
+    def add_process_function(self, name: str, reference: str, function_call: Optional[FunctionCall] = None,
+                             class_map: Optional[Dict[str, type]] = None) -> None:
+        """
+        Register a CPU-bound function that runs in the caller's process pool instead of holding the GIL.
+        reference is the importable name of the function, e.g. "my_tools.science:analyze_scientific_data",
+        which workers import once. Parsing, validation and transformation stay in this process; only the
+        reference and the params are sent to a worker. Use start_process_pool to spawn the workers upfront.
+        """
+        resolve_function_reference(reference)
+        self.add_function(name, ProcessFunction(reference, self._get_process_pool), function_call, class_map)
+
+    def start_process_pool(self) -> None:
+        """Spawn all process pool workers and import the registered process functions in them now."""
+        pool = self._get_process_pool()
+        worker_count = self.process_workers or os.cpu_count() or 1
+        for future in [pool.submit(warm_up_worker) for _ in range(worker_count)]:
+            future.result()
 
     def add_param_transformer(self, function_name: str,
                               transformer: Callable[[Dict[str, Any]], Dict[str, Any]]) -> None:
         self.param_transformers[function_name] = transformer
 
+    def add_prewarm_hook(self, function_name: str, hook: Callable[[], None]) -> None:
+        """
+        Register a hook, e.g. opening a connection, that execute_function_stream starts on the thread pool
+        as soon as the name of the function has been generated. Hooks are best effort: the call does not
+        wait for them and their errors are only logged.
+        """
+        self.prewarm_hooks[function_name] = hook
+
+    def enable_memoization(self, function_name: str, max_size: int = 256, ttl: Optional[float] = None) -> ResultCache:
+        """
+        Memoize the results of an idempotent function by its params (before transformation), in an LRU of
+        max_size entries that expire after ttl seconds. Identical concurrent calls run the function once.
+        Returns the ResultCache, e.g. for invalidate() and stats().
+        """
+        cache = ResultCache(max_size, ttl)
+        self.result_caches[function_name] = cache
+        return cache
+
+    def disable_memoization(self, function_name: str) -> None:
+        self.result_caches.pop(function_name, None)
+
+    def enable_metrics(self, exporter: Optional[MetricsExporter] = None,
+                       buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> CallMetrics:
+        """
+        Start recording per-function call and error counts and parse, transform and execute latencies.
+        exporter, if given, is called after every call with the function name, stage timings and error.
+        While metrics are disabled (the default) no timings are taken.
+        """
+        self.metrics = CallMetrics(exporter, buckets)
+        return self.metrics
+
+    def disable_metrics(self) -> None:
+        self.metrics = None
+
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        """Return the recorded metrics keyed by function name, or an empty dict if metrics are disabled."""
+        return self.metrics.snapshot() if self.metrics is not None else {}
+
+    def set_concurrency_limit(self, function_name: str, limit: Optional[int]) -> None:
+        """Limit how many calls of a function execute_function_async runs at once. None removes the limit."""
+        if limit is None:
+            self.concurrency_limits.pop(function_name, None)
+            self._semaphores.pop(function_name, None)
+            return
+        if limit < 1:
+            raise ValueError("Concurrency limit must be at least 1")
+        self.concurrency_limits[function_name] = limit
+        self._semaphores[function_name] = asyncio.Semaphore(limit)
+
+    def _prepare_call(self, data: Dict[str, Any]) -> Tuple[str, Callable, Dict[str, Any]]:
+        func_name: str = data["function"]
+        params: Dict[str, Any] = data["params"]
+
+        if func_name not in self.function_map:
+            raise ValueError("Function not defined")
+
+        validator = self.validators.get(func_name)
+        if validator is not None:
+            validator(params)
+
+        # Apply parameter transformation if available
+        if func_name in self.param_transformers:
+            params = self.param_transformers[func_name](params)
+
+        return func_name, self.function_map[func_name], params
+
+    def _run(self, call: Any) -> Any:
+        """Decode call unless it already is a dict and dispatch it, recording metrics if they are enabled."""
+        metrics = self.metrics
+        if metrics is None:
+            return self._dispatch(self.json_decoder(call) if isinstance(call, (str, bytes)) else call)
+
+        timings: Dict[str, float] = {}
+        func_name = None
+        try:
+            if isinstance(call, (str, bytes)):
+                start = time.perf_counter()
+                data = self.json_decoder(call)
+                timings["parse"] = time.perf_counter() - start
+            else:
+                data = call
+            func_name = self._metrics_name(data)
+            result = self._dispatch(data, timings)
+        except Exception as e:
+            metrics.record(func_name, timings, e)
+            raise
+        metrics.record(func_name, timings)
+        return result
+
+    def _metrics_name(self, data: Any) -> Optional[str]:
+        # Unregistered names are recorded as unknown so that bad input cannot grow the metrics without bound
+        func_name = data.get("function") if isinstance(data, dict) else None
+        return func_name if func_name in self.function_map else None
+
+    def _dispatch(self, data: Dict[str, Any], timings: Optional[Dict[str, float]] = None) -> Any:
+        cache = self.result_caches.get(data["function"])
+        # Build the key before transformers get a chance to modify the params
+        key = canonicalize_params(data["params"]) if cache is not None else None
+        if timings is None:
+            _, function, params = self._prepare_call(data)
+            if cache is None:
+                return function(**params)
+            return cache.get_or_compute(key, lambda: function(**params))
+
+        start = time.perf_counter()
+        _, function, params = self._prepare_call(data)
+        prepared = time.perf_counter()
+        timings["transform"] = prepared - start
+        try:
+            if cache is None:
+                return function(**params)
+            return cache.get_or_compute(key, lambda: function(**params))
+        finally:
+            timings["execute"] = time.perf_counter() - prepared
+
     def execute_function(self, json_input: str) -> Any:
         try:
-            data: Dict[str, Any] = json.loads(json_input)
-            func_name: str = data["function"]
-            params: Dict[str, Any] = data["params"]
+            return self._run(json_input)
 
-            if func_name not in self.function_map:
-                raise ValueError("Function not defined")
+        except Exception as e:
+            logging.error(f"Error executing function: {e}")
+            raise e
 
-            # Apply parameter transformation if available
-            if func_name in self.param_transformers:
-                params = self.param_transformers[func_name](params)
+    def execute_many(self, json_inputs: Iterable[str], executor: Optional[Executor] = None) -> List[CallResult]:
+        """
+        Parse and execute many function call JSONs in parallel on executor (the caller's thread pool by default).
+        Results are returned in input order; a failing input yields a CallResult with its error instead of
+        aborting the batch.
+        """
+        return self._execute_batch(json_inputs, executor)
 
-            return self.function_map[func_name](**params)
+    def execute_function_calls(self, json_input: str, executor: Optional[Executor] = None) -> List[CallResult]:
+        """
+        Execute the JSON array of function calls generated with a multi_call grammar. The calls run
+        concurrently and one CallResult per call is returned in array order. A single call object is
+        treated as an array of one.
+        """
+        try:
+            calls = self._parse_function_calls(json_input)
+        except Exception as e:
+            logging.error(f"Error executing function: {e}")
+            raise e
+        return self._execute_batch(calls, executor)
+
+    def execute_function_stream(self, chunks: Iterable[str],
+                                on_event: Optional[Callable[[CallEvent], None]] = None) -> Any:
+        """
+        Execute a function call while it is being generated, with chunks being the text streamed from llama.cpp.
+        Pre-warm hooks start as soon as a function name is complete and on_event receives every CallEvent.
+        A single call is executed as soon as its object is complete and its result returned. The calls of a
+        multi-call array are submitted to the thread pool one by one as they complete, and a list of
+        CallResults is returned.
+        """
+        parser = StreamingCallParser(self.json_decoder)
+        futures = []
+        result = None
+        try:
+            for chunk in chunks:
+                for event in parser.feed(chunk):
+                    if on_event is not None:
+                        on_event(event)
+                    if event.kind == CallEvent.FUNCTION:
+                        hook = self.prewarm_hooks.get(event.name)
+                        if hook is not None:
+                            self._get_executor().submit(self._run_prewarm_hook, event.name, hook)
+                    elif event.kind == CallEvent.CALL:
+                        data = {"function": event.name, "params": event.value}
+                        if parser.is_array:
+                            futures.append(self._get_executor().submit(self._execute_captured, event.index, data))
+                        else:
+                            result = self._run(data)
+            parser.close()
 
         except Exception as e:
             logging.error(f"Error executing function: {e}")
             raise e
+        if parser.is_array:
+            return [future.result() for future in futures]
+        return result
+
+    @staticmethod
+    def _run_prewarm_hook(function_name: str, hook: Callable[[], None]) -> None:
+        try:
+            hook()
+        except Exception as e:
+            logging.warning(f"Pre-warm hook of {function_name} failed: {e}")
+
+    def _execute_batch(self, calls: Iterable[Any], executor: Optional[Executor]) -> List[CallResult]:
+        if executor is None:
+            executor = self._get_executor()
+        futures = [executor.submit(self._execute_captured, index, call) for index, call in enumerate(calls)]
+        return [future.result() for future in futures]
+
+    def _execute_captured(self, index: int, call: Any) -> CallResult:
+        try:
+            return CallResult(index, value=self._run(call))
+        except Exception as e:
+            logging.error(f"Error executing function: {e}")
+            return CallResult(index, error=e)
+
+    def _parse_function_calls(self, json_input: str) -> List[Dict[str, Any]]:
+        calls = self.json_decoder(json_input)
+        if isinstance(calls, dict):
+            return [calls]
+        if not isinstance(calls, list):
+            raise ValueError("Expected a function call object or an array of function calls")
+        return calls
+
+    async def execute_function_async(self, json_input: str) -> Any:
+        """
+        Async variant of execute_function. Coroutine functions are awaited on the running event loop,
+        synchronous functions run on the caller's thread pool so they do not block it. Calls of a function
+        with a concurrency limit wait for a free slot; other calls are not held up by them.
+        """
+        try:
+            return await self._run_async(json_input)
+
+        except Exception as e:
+            logging.error(f"Error executing function: {e}")
+            raise e
+
+    async def execute_function_calls_async(self, json_input: str) -> List[CallResult]:
+        """Async variant of execute_function_calls; the calls are dispatched as in execute_function_async."""
+        try:
+            calls = self._parse_function_calls(json_input)
+        except Exception as e:
+            logging.error(f"Error executing function: {e}")
+            raise e
+        return list(await asyncio.gather(*(self._dispatch_captured_async(index, call)
+                                           for index, call in enumerate(calls))))
+
+    async def _dispatch_captured_async(self, index: int, data: Dict[str, Any]) -> CallResult:
+        try:
+            return CallResult(index, value=await self._run_async(data))
+        except Exception as e:
+            logging.error(f"Error executing function: {e}")
+            return CallResult(index, error=e)
+
+    async def _run_async(self, call: Any) -> Any:
+        """Async counterpart of _run."""
+        metrics = self.metrics
+        if metrics is None:
+            return await self._dispatch_async(self.json_decoder(call) if isinstance(call, (str, bytes)) else call)
+
+        timings: Dict[str, float] = {}
+        func_name = None
+        try:
+            if isinstance(call, (str, bytes)):
+                start = time.perf_counter()
+                data = self.json_decoder(call)
+                timings["parse"] = time.perf_counter() - start
+            else:
+                data = call
+            func_name = self._metrics_name(data)
+            result = await self._dispatch_async(data, timings)
+        except Exception as e:
+            metrics.record(func_name, timings, e)
+            raise
+        metrics.record(func_name, timings)
+        return result
+
+    async def _dispatch_async(self, data: Dict[str, Any], timings: Optional[Dict[str, float]] = None) -> Any:
+        cache = self.result_caches.get(data["function"])
+        key = canonicalize_params(data["params"]) if cache is not None else None
+        start = time.perf_counter() if timings is not None else 0.0
+        func_name, function, params = self._prepare_call(data)
+        if timings is not None:
+            prepared = time.perf_counter()
+            timings["transform"] = prepared - start
+        try:
+            if cache is None:
+                return await self._limited_call_async(func_name, function, params)
+            # Coalesced calls wait on the running one without taking a concurrency slot
+            return await cache.get_or_compute_async(key, lambda: self._limited_call_async(func_name, function, params))
+        finally:
+            if timings is not None:
+                timings["execute"] = time.perf_counter() - prepared
+
+    async def _limited_call_async(self, func_name: str, function: Callable, params: Dict[str, Any]) -> Any:
+        semaphore = self._semaphores.get(func_name)
+        if semaphore is None:
+            return await self._call_async(function, params)
+        async with semaphore:
+            return await self._call_async(function, params)
+
+    async def _call_async(self, function: Callable, params: Dict[str, Any]) -> Any:
+        if isinstance(function, ProcessFunction):
+            return await asyncio.wrap_future(function.submit(params))
+        if inspect.iscoroutinefunction(function):
+            return await function(**params)
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self._get_executor(), functools.partial(function, **params))
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix="llm-function-caller")
+        return self._executor
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            with self._executor_lock:
+                if self._process_pool is None:
+                    references = tuple(function.reference for function in self.function_map.values()
+                                       if isinstance(function, ProcessFunction))
+                    self._process_pool = ProcessPoolExecutor(max_workers=self.process_workers,
+                                                             mp_context=self._process_context(),
+                                                             initializer=warm_up_worker, initargs=(references,))
+        return self._process_pool
+
+    def _process_context(self):
+        """
+        The pool is often started from one of the caller's threads, and forking a multi-threaded process can
+        deadlock the children on inherited locks. Workers import functions by reference and need no state
+        of this process, so forkserver (or spawn where it is unavailable) is used unless configured otherwise.
+        Both import the main module of the script in the workers: a script that uses the process pool must
+        start it under if __name__ == "__main__":, or the workers fail and calls raise BrokenProcessPool.
+        Functions defined in the script itself cannot be referenced, as "__main__" is a different module in
+        the workers; put them in an importable module.
+        """
+        method = self.process_start_method
+        if method is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        return multiprocessing.get_context(method)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the thread pool and the process pool, if they were started."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+            process_pool, self._process_pool = self._process_pool, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+        if process_pool is not None:
+            process_pool.shutdown(wait=wait)
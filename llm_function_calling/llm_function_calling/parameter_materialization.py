@@ -0,0 +1,100 @@
+from enum import Enum
+from typing import Any, Callable, Dict, Optional
+
+from .function_call import DataType, FunctionCall, FunctionParameter
+
+
+def compile_value_converter(param: FunctionParameter, path: str, class_map: Dict[str, type],
+                            used_paths: set) -> Optional[Callable[[Any], Any]]:
+    """
+    Compile the converter for the value at path, or return None if neither the value nor anything
+    nested in it is mapped to a class, so unmapped values are passed through without a call.
+    """
+    target = class_map.get(path)
+    if target is not None:
+        used_paths.add(path)
+
+    if param.type == DataType.ARRAY:
+        if param.element_type is None:
+            return None
+        # The class of an array path applies to its elements
+        return compile_array_converter(param.element_type, path, class_map, used_paths)
+
+    if param.type == DataType.OBJECT:
+        return compile_object_converter(param.structure or {}, path, target, class_map, used_paths)
+
+    if target is not None and issubclass(target, Enum):
+        members = {member.value: member for member in target}
+
+        def convert_enum(value):
+            try:
+                return members[value]
+            except (KeyError, TypeError):
+                raise ValueError(f"{path}: {value!r} is not a valid {target.__name__}") from None
+        return convert_enum
+
+    if target is not None:
+        return target
+    return None
+
+
+def compile_array_converter(element_type: FunctionParameter, path: str, class_map: Dict[str, type],
+                            used_paths: set) -> Optional[Callable[[Any], Any]]:
+    convert_element = compile_value_converter(element_type, path, class_map, used_paths)
+    if convert_element is None:
+        return None
+
+    def convert_array(value):
+        return [convert_element(item) for item in value]
+    return convert_array
+
+
+def compile_object_converter(structure: Dict[str, FunctionParameter], path: str, target: Optional[type],
+                             class_map: Dict[str, type], used_paths: set) -> Optional[Callable[[Any], Any]]:
+    field_converters = []
+    for name, field in structure.items():
+        converter = compile_value_converter(field, f"{path}.{name}" if path else name, class_map, used_paths)
+        if converter is not None:
+            field_converters.append((name, converter))
+
+    if target is None and not field_converters:
+        return None
+    if target is None:
+        def convert_fields(value):
+            fields = dict(value)
+            for name, converter in field_converters:
+                if name in fields:
+                    fields[name] = converter(fields[name])
+            return fields
+        return convert_fields
+    if not field_converters:
+        def construct(value):
+            return target(**value)
+        return construct
+
+    def convert_object(value):
+        fields = dict(value)
+        for name, converter in field_converters:
+            if name in fields:
+                fields[name] = converter(fields[name])
+        return target(**fields)
+    return convert_object
+
+
+def compile_materializer(function_call: FunctionCall, class_map: Dict[str, type]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Compile a param transformer that turns the decoded params of function_call into typed objects.
+    class_map maps parameter paths to classes: "address" or "shipping.address" for objects, which are
+    constructed with their fields as keyword arguments, "items" for the elements of an array, and
+    "items.category" for an ENUM converted to an Enum member. The schema and class map are only inspected
+    here; the returned function just runs the specialized converters.
+    Raises ValueError if a path in class_map does not exist in the schema.
+    """
+    used_paths = set()
+    convert = compile_object_converter(function_call.parameters.properties, "", None, class_map, used_paths)
+    unknown = sorted(set(class_map) - used_paths)
+    if unknown:
+        raise ValueError(f"Unknown parameter paths for {function_call.name}: {', '.join(unknown)}")
+    if convert is None:
+        return dict
+    return convert
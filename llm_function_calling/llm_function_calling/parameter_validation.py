@@ -0,0 +1,129 @@
+from typing import Any, Callable, Dict, List
+
+from .function_call import DataType, FunctionCall, FunctionParameter
+
+
+class ParameterValidationError(ValueError):
+    """
+    Raised when the params of a function call do not match its FunctionCall schema.
+    errors is a list of {"path": ..., "message": ...} dicts, e.g. {"path": "items[2].quantity", ...}.
+    """
+
+    def __init__(self, function_name: str, errors: List[Dict[str, str]]):
+        self.function_name = function_name
+        self.errors = errors
+        details = "; ".join(f"{error['path'] or '<params>'}: {error['message']}" for error in errors)
+        super().__init__(f"Invalid parameters for {function_name}: {details}")
+
+
+def _join_path(name: str, path: str) -> str:
+    if not path:
+        return name
+    return f"{name}{path}" if path.startswith("[") else f"{name}.{path}"
+
+
+def compile_parameter_check(param: FunctionParameter) -> Callable[[Any, list], None]:
+    """
+    Compile a FunctionParameter into a check(value, errors) closure. The schema is inspected only here;
+    checking a value just calls the specialized closures and appends [path, message] pairs on failure.
+    """
+    if param.type == DataType.OBJECT:
+        return compile_object_check(param.structure or {})
+
+    if param.type == DataType.ARRAY:
+        element_check = compile_parameter_check(param.element_type) if param.element_type is not None else None
+
+        def check_array(value, errors):
+            if not isinstance(value, list):
+                errors.append(["", f"expected array, got {type(value).__name__}"])
+                return
+            if element_check is None:
+                return
+            for index, item in enumerate(value):
+                error_count = len(errors)
+                element_check(item, errors)
+                for error in errors[error_count:]:
+                    error[0] = _join_path(f"[{index}]", error[0])
+        return check_array
+
+    if param.enum:
+        allowed = frozenset(param.enum)
+        allowed_text = ", ".join(param.enum)
+
+        def check_enum(value, errors):
+            if value not in allowed:
+                errors.append(["", f"expected one of {allowed_text}, got {value!r}"])
+        return check_enum
+
+    if param.type == DataType.STRING:
+        def check_string(value, errors):
+            if not isinstance(value, str):
+                errors.append(["", f"expected string, got {type(value).__name__}"])
+        return check_string
+
+    if param.type == DataType.BOOLEAN:
+        def check_boolean(value, errors):
+            if not isinstance(value, bool):
+                errors.append(["", f"expected boolean, got {type(value).__name__}"])
+        return check_boolean
+
+    if param.type == DataType.NUMBER:
+        def check_number(value, errors):
+            if not isinstance(value, int) or isinstance(value, bool):
+                errors.append(["", f"expected number, got {type(value).__name__}"])
+        return check_number
+
+    if param.type == DataType.FLOAT:
+        def check_float(value, errors):
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                errors.append(["", f"expected float, got {type(value).__name__}"])
+        return check_float
+
+    # ENUM without values: only the JSON type is known
+    def check_any_string(value, errors):
+        if not isinstance(value, str):
+            errors.append(["", f"expected string, got {type(value).__name__}"])
+    return check_any_string
+
+
+def compile_object_check(structure: Dict[str, FunctionParameter]) -> Callable[[Any, list], None]:
+    field_checks = [(name, compile_parameter_check(param)) for name, param in structure.items()]
+    required = [name for name, param in structure.items() if param.required]
+    known = frozenset(structure)
+
+    def check_object(value, errors):
+        if not isinstance(value, dict):
+            errors.append(["", f"expected object, got {type(value).__name__}"])
+            return
+        for name in required:
+            if name not in value:
+                errors.append([name, "missing required field"])
+        if len(value) > len(known) or not known.issuperset(value):
+            for name in value:
+                if name not in known:
+                    errors.append([name, "unexpected field"])
+        for name, field_check in field_checks:
+            if name in value:
+                error_count = len(errors)
+                field_check(value[name], errors)
+                for error in errors[error_count:]:
+                    error[0] = _join_path(name, error[0])
+    return check_object
+
+
+def compile_validator(function_call: FunctionCall) -> Callable[[Dict[str, Any]], None]:
+    """
+    Compile the parameter schema of a FunctionCall once into a validate(params) function.
+    validate checks required fields, types, enum values and nested objects and arrays,
+    and raises a ParameterValidationError listing every problem found.
+    """
+    check_params = compile_object_check(function_call.parameters.properties)
+    function_name = function_call.name
+
+    def validate(params: Dict[str, Any]) -> None:
+        errors = []
+        check_params(params, errors)
+        if errors:
+            raise ParameterValidationError(function_name, [{"path": path, "message": message}
+                                                           for path, message in errors])
+    return validate
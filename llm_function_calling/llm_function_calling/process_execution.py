@@ -0,0 +1,56 @@
+import functools
+import importlib
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, Iterable
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_function_reference(reference: str) -> Callable:
+    """
+    Import the function named by reference, either "package.module:function" or "package.module.function".
+    Nested attributes need the colon form, e.g. "package.module:Class.method". Resolved once per process.
+    """
+    if ":" in reference:
+        module_name, _, qualname = reference.partition(":")
+    else:
+        module_name, _, qualname = reference.rpartition(".")
+    if not module_name or not qualname:
+        raise ValueError(f"Invalid function reference: {reference}")
+    target = importlib.import_module(module_name)
+    for attribute in qualname.split("."):
+        target = getattr(target, attribute)
+    if not callable(target):
+        raise ValueError(f"{reference} is not callable")
+    return target
+
+
+def call_function_reference(reference: str, params: Dict[str, Any]) -> Any:
+    """Entry point run in a worker process: resolve the function (cached) and call it with params."""
+    return resolve_function_reference(reference)(**params)
+
+
+def warm_up_worker(references: Iterable[str] = ()) -> None:
+    """Process pool initializer importing the registered functions before the first call arrives."""
+    for reference in references:
+        resolve_function_reference(reference)
+
+
+class ProcessFunction:
+    """
+    Stand-in registered in LLMFunctionCaller.function_map for a function that runs in the process pool.
+    Only the reference and the params are sent to the worker; the params, after transformation,
+    and the result must be picklable.
+    """
+
+    def __init__(self, reference: str, get_pool: Callable[[], Executor]):
+        self.reference = reference
+        self._get_pool = get_pool
+
+    def submit(self, params: Dict[str, Any]) -> Future:
+        return self._get_pool().submit(call_function_reference, self.reference, params)
+
+    def __call__(self, **params) -> Any:
+        return self.submit(params).result()
+
+    def __repr__(self):
+        return f"ProcessFunction({self.reference!r})"
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+def canonicalize_params(params: Dict[str, Any]) -> str:
+    """Return a canonical JSON text of decoded params, independent of key order."""
+    return json.dumps(params, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+class ResultCache:
+    """
+    Memoized results of one idempotent function, keyed by its canonicalized params.
+    Entries are kept in an LRU of max_size entries and expire ttl seconds after they were computed
+    (never if ttl is None). Concurrent calls with the same key are coalesced: the first one runs the
+    function and the others wait for its result. Exceptions are passed on to waiting callers but not cached.
+    """
+
+    def __init__(self, max_size: int = 256, ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.expirations = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._pending: Dict[str, Future] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for key (see canonicalize_params) or compute and store it."""
+        found, value, future, generation = self._begin(key)
+        if found:
+            return value
+        if generation is None:
+            return future.result()
+        try:
+            value = compute()
+        except BaseException as e:
+            self._fail(key, future, e)
+            raise
+        self._finish(key, future, generation, value)
+        return value
+
+    async def get_or_compute_async(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        found, value, future, generation = self._begin(key)
+        if found:
+            return value
+        if generation is None:
+            return await asyncio.wrap_future(future)
+        try:
+            value = await compute()
+        except BaseException as e:
+            self._fail(key, future, e)
+            raise
+        self._finish(key, future, generation, value)
+        return value
+
+    def invalidate(self, params: Optional[Dict[str, Any]] = None) -> None:
+        """Drop the entry for params, or every entry if params is None. Running calls are not stored."""
+        with self._lock:
+            self._generation += 1
+            if params is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(canonicalize_params(params), None)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.coalesced = 0
+            self.expirations = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "expirations": self.expirations,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+    def _begin(self, key: str) -> Tuple[bool, Any, Optional[Future], Optional[int]]:
+        """
+        Return (True, value, None, None) on a hit, (False, None, future, None) if an identical call is
+        running, or (False, None, future, generation) if the caller has to compute the value.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                computed_at, value = entry
+                if self.ttl is None or self.clock() - computed_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value, None, None
+                del self._entries[key]
+                self.expirations += 1
+
+            future = self._pending.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return False, None, future, None
+            future = Future()
+            self._pending[key] = future
+            self.misses += 1
+            return False, None, future, self._generation
+
+    def _finish(self, key: str, future: Future, generation: int, value: Any) -> None:
+        with self._lock:
+            del self._pending[key]
+            # Skip storing if the cache was invalidated while the function was running
+            if generation == self._generation:
+                self._entries[key] = (self.clock(), value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        future.set_result(value)
+
+    def _fail(self, key: str, future: Future, error: BaseException) -> None:
+        with self._lock:
+            del self._pending[key]
+        future.set_exception(error)
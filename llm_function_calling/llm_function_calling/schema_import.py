@@ -0,0 +1,289 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+from .function_call import DataType, FrozenFunctionCall, FunctionCall, FunctionParameter, FunctionParameters
+from .grammar_cache import atomic_write
+
+# Part of the on-disk cache key, bump when the conversion changes
+IMPORT_FORMAT_VERSION = 1
+
+# Start of an object whose first field is the "tools" array, and the text kept buffered to recognize it
+TOOLS_FIELD_PATTERN = re.compile(r'\{\s*"tools"\s*:\s*\[')
+TOOLS_FIELD_LOOKAHEAD = 64
+
+# JSON Schema "integer" values match the grammar's number rule, "number" values its float rule
+SCHEMA_TYPES = {
+    "string": DataType.STRING,
+    "boolean": DataType.BOOLEAN,
+    "integer": DataType.NUMBER,
+    "number": DataType.FLOAT,
+    "object": DataType.OBJECT,
+    "array": DataType.ARRAY,
+}
+
+
+def _schema_type(schema: Dict[str, Any], path: str) -> Optional[str]:
+    """Return the single non-null type of a schema, accepting ["string", "null"] style nullable types."""
+    schema_type = schema.get("type")
+    if isinstance(schema_type, list):
+        types = [item for item in schema_type if item != "null"]
+        if len(types) != 1:
+            raise ValueError(f"{path}: multiple types are not supported: {schema_type}")
+        schema_type = types[0]
+    return schema_type
+
+
+def convert_json_schema(schema: Dict[str, Any], required: bool = True, path: str = "") -> FunctionParameter:
+    """
+    Convert a JSON Schema to a FunctionParameter. type, enum, properties, items, required and description
+    are mapped; other keywords such as format or minimum are ignored. Enums must have string values.
+    Raises ValueError for schemas the grammar cannot express, e.g. $ref, anyOf or untyped values.
+    """
+    description = schema.get("description")
+    if "enum" in schema:
+        values = schema["enum"]
+        if not all(isinstance(value, str) for value in values):
+            raise ValueError(f"{path}: only string enums are supported")
+        return FunctionParameter(DataType.ENUM, required, description, enum=list(values))
+
+    schema_type = _schema_type(schema, path)
+    if schema_type is None:
+        schema_type = "object" if "properties" in schema else None
+    if schema_type not in SCHEMA_TYPES:
+        raise ValueError(f"{path}: unsupported schema: {json.dumps(schema)[:200]}")
+
+    data_type = SCHEMA_TYPES[schema_type]
+    if data_type == DataType.OBJECT:
+        return FunctionParameter(DataType.OBJECT, required, description,
+                                 structure=convert_properties(schema, path))
+    if data_type == DataType.ARRAY:
+        items = schema.get("items")
+        if not isinstance(items, dict):
+            raise ValueError(f"{path}: arrays need an items schema")
+        return FunctionParameter(DataType.ARRAY, required, description,
+                                 element_type=convert_json_schema(items, True, f"{path}[]"))
+    return FunctionParameter(data_type, required, description)
+
+
+def convert_properties(schema: Dict[str, Any], path: str = "") -> Dict[str, FunctionParameter]:
+    required = set(schema.get("required", ()))
+    return {name: convert_json_schema(property_schema, name in required, f"{path}.{name}" if path else name)
+            for name, property_schema in schema.get("properties", {}).items()}
+
+
+def convert_openai_tool(tool: Dict[str, Any]) -> FunctionCall:
+    """
+    Convert one tool in OpenAI format, {"type": "function", "function": {...}}, or a bare function
+    definition with name, description and a JSON Schema of the parameters, to a FunctionCall.
+    """
+    function = tool.get("function", tool)
+    name = function.get("name")
+    if not name:
+        raise ValueError(f"Tool without name: {json.dumps(tool)[:200]}")
+    try:
+        properties = convert_properties(function.get("parameters") or {})
+    except ValueError as e:
+        raise ValueError(f"Invalid parameters for {name}: {e}") from None
+    return FunctionCall(name, function.get("description", ""), FunctionParameters(properties))
+
+
+def iter_tool_catalog(file: TextIO, chunk_size: int = 1 << 16) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the tools of a catalog read incrementally from a text file. A catalog is a JSON array of tools,
+    one tool per line (JSON Lines) or objects with a "tools" array, as in OpenAI requests. Arrays are decoded
+    one tool at a time, including the "tools" array of an object that starts with it; other objects,
+    such as requests with "tools" after other fields, are decoded whole.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    end_of_file = False
+    in_array = None
+    # Streamed "tools" array of an object: "tools" inside the array, "end" after its closing bracket
+    wrapper = None
+    discard = False
+    while True:
+        while position < len(buffer) and (buffer[position].isspace() or in_array and buffer[position] == ","):
+            position += 1
+        if position == len(buffer) and end_of_file:
+            if in_array or wrapper:
+                raise ValueError("Tool catalog ends inside the array")
+            return
+        # Outside arrays, keep enough text buffered to recognize the start of a "tools" field
+        if not end_of_file and (position == len(buffer) or
+                                not in_array and len(buffer) - position < TOOLS_FIELD_LOOKAHEAD):
+            chunk = file.read(chunk_size)
+            buffer = buffer[position:] + chunk
+            position = 0
+            end_of_file = not chunk
+            continue
+
+        if wrapper == "end":
+            wrapper = None
+            if buffer[position] == "}":
+                position += 1
+                continue
+            if buffer[position] != ",":
+                raise ValueError(f"Invalid tool catalog: unexpected {buffer[position]!r} after the tools array")
+            # Decode the remaining fields as an object of their own and drop them
+            buffer = "{" + buffer[position + 1:]
+            position = 0
+            discard = True
+        else:
+            if in_array is None:
+                in_array = buffer[position] == "["
+                if in_array:
+                    position += 1
+                    continue
+            if not in_array:
+                match = TOOLS_FIELD_PATTERN.match(buffer, position)
+                if match:
+                    in_array = True
+                    wrapper = "tools"
+                    position = match.end()
+                    continue
+            if in_array and buffer[position] == "]":
+                if wrapper is None:
+                    return
+                in_array = False
+                wrapper = "end"
+                position += 1
+                continue
+
+        try:
+            value, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as e:
+            if end_of_file:
+                raise ValueError(f"Invalid tool catalog: {e}") from None
+            # Grow reads with the buffer, so a tool larger than chunk_size is decoded a logarithmic number of times
+            chunk = file.read(max(chunk_size, len(buffer) - position))
+            buffer = buffer[position:] + chunk
+            position = 0
+            end_of_file = not chunk
+            continue
+
+        if discard:
+            discard = False
+        elif isinstance(value, dict) and isinstance(value.get("tools"), list):
+            yield from value["tools"]
+        elif isinstance(value, dict):
+            yield value
+        else:
+            raise ValueError(f"Tool catalog entries must be objects, got {type(value).__name__}")
+        if position >= chunk_size:
+            buffer = buffer[position:]
+            position = 0
+
+
+def import_tool_catalog(file_path: str) -> List[FunctionCall]:
+    """Convert every tool of a catalog file (see iter_tool_catalog) to a FunctionCall, without caching."""
+    with open(file_path, 'r', encoding='utf-8') as file:
+        return [convert_openai_tool(tool) for tool in iter_tool_catalog(file)]
+
+
+def hash_source_file(file_path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ToolCatalogImporter:
+    """
+    Imports tool catalogs, caching the converted definitions by the SHA-256 of the catalog file.
+    Conversions are kept in an in-process LRU and, if cache_dir is set, pickled to disk as
+    <source hash>-v<IMPORT_FORMAT_VERSION>.pickle, so restarts only hash the catalog instead of converting it.
+    Only point cache_dir at a directory you trust, as its files are unpickled.
+    Definitions are returned as interned FrozenFunctionCall instances: they can safely be shared between
+    callers, and sharing equal parameters keeps the pickles small and fast to load.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_size: int = 16):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def load(self, file_path: str) -> List[FrozenFunctionCall]:
+        """Return the definitions of a catalog file, converting it only on a cache miss."""
+        source_hash = hash_source_file(file_path)
+        with self._lock:
+            function_calls = self._entries.get(source_hash)
+            if function_calls is not None:
+                self._entries.move_to_end(source_hash)
+                self.hits += 1
+                return list(function_calls)
+
+        function_calls = self._read_from_disk(source_hash)
+        if function_calls is not None:
+            with self._lock:
+                self.disk_hits += 1
+                self._remember(source_hash, function_calls)
+            return list(function_calls)
+
+        intern_table = {}
+        function_calls = [function_call.freeze(intern_table) for function_call in import_tool_catalog(file_path)]
+        with self._lock:
+            self.misses += 1
+            self._remember(source_hash, function_calls)
+        self._write_to_disk(source_hash, function_calls)
+        return list(function_calls)
+
+    def clear(self) -> None:
+        """Drop all in-memory entries and reset the counters. Files in cache_dir are kept."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.disk_hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+    def _remember(self, source_hash: str, function_calls: list) -> None:
+        self._entries[source_hash] = function_calls
+        self._entries.move_to_end(source_hash)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _cache_path(self, source_hash: str) -> str:
+        return os.path.join(self.cache_dir, f"{source_hash}-v{IMPORT_FORMAT_VERSION}.pickle")
+
+    def _read_from_disk(self, source_hash: str) -> Optional[list]:
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._cache_path(source_hash), 'rb') as file:
+                return pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+            # A truncated or stale entry is a miss; load converts again and overwrites it
+            logging.warning(f"Ignoring unreadable tool catalog cache {self._cache_path(source_hash)}: {e}")
+            return None
+
+    def _write_to_disk(self, source_hash: str, function_calls: list) -> None:
+        if self.cache_dir is None:
+            return
+        with atomic_write(self._cache_path(source_hash), 'wb') as file:
+            pickle.dump(function_calls, file, protocol=pickle.HIGHEST_PROTOCOL)
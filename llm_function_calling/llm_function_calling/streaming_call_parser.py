@@ -0,0 +1,171 @@
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+
+class CallEvent:
+    """
+    Event emitted by StreamingCallParser.
+    kind is FUNCTION when the function name is complete (name is the function name), PARAM when a top-level
+    parameter is complete (name and value) and CALL when the whole call object is complete (name is the
+    function name, value the params dict). index is the position of the call in a multi-call array, else 0.
+    """
+    FUNCTION = "function"
+    PARAM = "param"
+    CALL = "call"
+
+    def __init__(self, kind: str, index: int, name: Optional[str] = None, value: Any = None):
+        self.kind = kind
+        self.index = index
+        self.name = name
+        self.value = value
+
+    def __repr__(self):
+        return f"CallEvent({self.kind!r}, index={self.index}, name={self.name!r}, value={self.value!r})"
+
+
+class StreamingCallParser:
+    """
+    Incremental parser for function call JSON as it is streamed from llama.cpp, either a single call object
+    or an array of calls generated with a multi_call grammar. feed() takes chunks of any size and returns
+    the events completed by them, so the caller can act on the function name before the params are
+    generated. Only the text of the value currently being read is buffered.
+    decoder decodes the text of every completed name and value, e.g. a decoder from get_json_decoder.
+    """
+
+    def __init__(self, decoder: Callable[[str], Any] = json.loads):
+        self.decoder = decoder
+        self.depth = 0
+        self.is_array: Optional[bool] = None
+        self.done = False
+        self._call_level = 1
+        self._in_string = False
+        self._escape = False
+        self._expect_key = False
+        self._call_key: Optional[str] = None
+        self._param_key: Optional[str] = None
+        self._capture: Optional[List[str]] = None
+        self._capture_role: Optional[str] = None   # "call-key", "function", "param-key" or "param"
+        self._capture_depth = 0
+        self._call_index = -1
+        self._function_name: Optional[str] = None
+        self._params: Dict[str, Any] = {}
+
+    def feed(self, chunk: str) -> List[CallEvent]:
+        events: List[CallEvent] = []
+        start = 0
+        for position, char in enumerate(chunk):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._capture is not None and (self._capture_role != "param"
+                                                      or self.depth == self._capture_depth):
+                        self._capture.append(chunk[start:position + 1])
+                        self._finish_capture(events)
+                continue
+
+            if char in " \t\r\n":
+                continue
+            if self.done:
+                raise ValueError(f"Unexpected data after function call: {chunk[position:position + 20]!r}")
+            if self.is_array is None:
+                if char not in "{[":
+                    raise ValueError(f"Function call must start with '{{' or '[', got {char!r}")
+                self.is_array = char == "["
+                self._call_level = 2 if self.is_array else 1
+
+            call_level = self._call_level
+            in_params = self.depth == call_level + 1 and self._call_key == "params"
+            if char == '"':
+                self._in_string = True
+                if self._capture is None:
+                    role = self._string_role(call_level)
+                    if role is not None:
+                        self._start_capture(role)
+                        start = position
+            elif char in "{[":
+                if in_params and not self._expect_key and self._capture is None:
+                    self._start_capture("param")
+                    start = position
+                self.depth += 1
+                if self.depth == call_level and char == "{":
+                    self._begin_call()
+                elif self.depth == call_level + 1 and self._call_key == "params" and char == "{":
+                    self._expect_key = True
+            elif char in "}]":
+                if self._capture_role == "param" and self.depth == call_level + 1:
+                    # Scalar value closed by the end of the params object
+                    self._capture.append(chunk[start:position])
+                    self._finish_capture(events)
+                self.depth -= 1
+                if self._capture_role == "param" and self.depth == call_level + 1:
+                    self._capture.append(chunk[start:position + 1])
+                    self._finish_capture(events)
+                elif self.depth == call_level - 1 and char == "}":
+                    events.append(CallEvent(CallEvent.CALL, self._call_index, self._function_name, self._params))
+                if self.depth == 0:
+                    self.done = True
+            elif char == ",":
+                if in_params:
+                    if self._capture_role == "param":
+                        self._capture.append(chunk[start:position])
+                        self._finish_capture(events)
+                    self._expect_key = True
+                elif self.depth == call_level:
+                    self._expect_key = True
+            elif char == ":":
+                if self.depth in (call_level, call_level + 1):
+                    self._expect_key = False
+            elif in_params and not self._expect_key and self._capture is None:
+                self._start_capture("param")
+                start = position
+
+        if self._capture is not None:
+            self._capture.append(chunk[start:])
+        return events
+
+    def close(self) -> None:
+        """Raise a ValueError if the stream ended before the function call was complete."""
+        if not self.done:
+            raise ValueError("Function call JSON is incomplete")
+
+    def _string_role(self, call_level: int) -> Optional[str]:
+        if self.depth == call_level:
+            if self._expect_key:
+                return "call-key"
+            if self._call_key == "function":
+                return "function"
+        elif self.depth == call_level + 1 and self._call_key == "params":
+            return "param-key" if self._expect_key else "param"
+        return None
+
+    def _start_capture(self, role: str) -> None:
+        self._capture = []
+        self._capture_role = role
+        self._capture_depth = self.depth
+
+    def _begin_call(self) -> None:
+        self._call_index += 1
+        self._expect_key = True
+        self._call_key = None
+        self._function_name = None
+        self._params = {}
+
+    def _finish_capture(self, events: List[CallEvent]) -> None:
+        value = self.decoder("".join(self._capture))
+        role = self._capture_role
+        self._capture = None
+        self._capture_role = None
+        if role == "call-key":
+            self._call_key = value
+        elif role == "function":
+            self._function_name = value
+            events.append(CallEvent(CallEvent.FUNCTION, self._call_index, value))
+        elif role == "param-key":
+            self._param_key = value
+        else:
+            self._params[self._param_key] = value
+            events.append(CallEvent(CallEvent.PARAM, self._call_index, self._param_key, value))
@@ -0,0 +1,201 @@
+import heapq
+import json
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .function_call import FunctionCall, FunctionParameter
+from .grammar_cache import atomic_write
+
+INDEX_FORMAT_VERSION = 1
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by can do for from how i in is it me my of on or please that the this to was "
+    "what when where which will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words of text without stop words, with snake_case split and a plural "s" removed."""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOP_WORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def _parameter_text(name: str, param: FunctionParameter, parts: List[str]) -> None:
+    parts.append(name)
+    if param.description:
+        parts.append(param.description)
+    for field_name, field in (param.structure or {}).items():
+        _parameter_text(field_name, field, parts)
+    if param.element_type is not None:
+        _parameter_text("", param.element_type, parts)
+
+
+def function_call_terms(function_call: FunctionCall) -> List[str]:
+    """Terms indexed for a function: its name, description and the names and descriptions of its parameters."""
+    parts = [function_call.name, function_call.description or ""]
+    for name, param in function_call.parameters.properties.items():
+        _parameter_text(name, param, parts)
+    return tokenize(" ".join(parts))
+
+
+class ToolRetrievalIndex:
+    """
+    BM25 inverted index over function names, descriptions and parameter descriptions, used to pick the
+    functions relevant to a user message so only their grammar and documentation are sent to the model.
+    Functions can be added, replaced and removed at any time; only the postings of the changed function
+    are touched. Runs fully in-process; save and load persist a prebuilt index as JSON.
+    """
+
+    def __init__(self, function_calls: Iterable[FunctionCall] = (), k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._terms: Dict[str, Tuple[str, ...]] = {}
+        self._total_length = 0
+        # Per-term scores of the current index state; every change alters the IDFs and average length
+        self._term_weights: Dict[str, Dict[str, float]] = {}
+        self._indexed: Dict[str, FunctionCall] = {}
+        self._registry_version: Optional[int] = None
+        self._lock = threading.Lock()
+        for function_call in function_calls:
+            self.add(function_call)
+
+    def add(self, function_call: FunctionCall) -> None:
+        """Index a function, replacing an earlier definition of the same name."""
+        terms = function_call_terms(function_call)
+        with self._lock:
+            self._remove(function_call.name)
+            self._add_terms(function_call.name, terms)
+            self._indexed[function_call.name] = function_call
+
+    def remove(self, name: str) -> None:
+        with self._lock:
+            self._remove(name)
+
+    def sync(self, registry) -> None:
+        """
+        Bring the index up to date with a FunctionRegistry, re-indexing only functions that were added,
+        replaced or removed since the last sync. Does nothing if the registry version did not change.
+        """
+        if registry.version == self._registry_version:
+            return
+        function_calls = registry.function_calls()
+        version = registry.version
+        current = {function_call.name: function_call for function_call in function_calls}
+        # Check every indexed name, as a loaded index has no definitions to compare against
+        with self._lock:
+            removed = [name for name in self._lengths if name not in current]
+        for name in removed:
+            self.remove(name)
+        for name, function_call in current.items():
+            if self._indexed.get(name) is not function_call:
+                self.add(function_call)
+        self._registry_version = version
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[str, float]]:
+        """Return up to top_k (function name, score) pairs for query, best first. Unmatched functions are left out."""
+        query_terms = set(tokenize(query))
+        scores: Dict[str, float] = {}
+        with self._lock:
+            for term in query_terms:
+                weights = self._term_weights.get(term)
+                if weights is None:
+                    if term not in self._postings:
+                        continue
+                    weights = self._term_weights[term] = self._weigh(self._postings[term])
+                if not scores:
+                    scores = dict(weights)
+                    continue
+                get = scores.get
+                for name, weight in weights.items():
+                    scores[name] = get(name, 0.0) + weight
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+    def search_names(self, query: str, top_k: int = 5) -> List[str]:
+        """Names of the top_k functions for query, e.g. for FunctionRegistry.select or SubsetGrammarPool."""
+        return [name for name, _ in self.search(query, top_k)]
+
+    def save(self, file_path: str) -> None:
+        """
+        Write the index as JSON, e.g. at build time. The definitions themselves are not stored, so the first
+        sync of a loaded index re-indexes every function of the registry.
+        """
+        with self._lock:
+            data = {
+                "index_format_version": INDEX_FORMAT_VERSION,
+                "k1": self.k1,
+                "b": self.b,
+                "lengths": self._lengths,
+                "postings": self._postings,
+            }
+            content = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+        with atomic_write(file_path) as file:
+            file.write(content)
+
+    @classmethod
+    def load(cls, file_path: str) -> 'ToolRetrievalIndex':
+        with open(file_path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        if data.get("index_format_version") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported tool index format: {data.get('index_format_version')}")
+        index = cls(k1=data["k1"], b=data["b"])
+        index._lengths = data["lengths"]
+        index._postings = data["postings"]
+        index._total_length = sum(index._lengths.values())
+        index._term_weights.clear()
+        terms: Dict[str, List[str]] = {name: [] for name in index._lengths}
+        for term, postings in index._postings.items():
+            for name in postings:
+                terms[name].append(term)
+        index._terms = {name: tuple(name_terms) for name, name_terms in terms.items()}
+        return index
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._lengths
+
+    def _weigh(self, postings: Dict[str, int]) -> Dict[str, float]:
+        """BM25 score contribution of one term for every function containing it."""
+        document_count = len(self._lengths)
+        idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+        k1 = self.k1
+        length_factor = k1 * self.b * document_count / self._total_length
+        base = k1 * (1 - self.b)
+        return {name: idf * frequency * (k1 + 1) / (frequency + base + length_factor * self._lengths[name])
+                for name, frequency in postings.items()}
+
+    def _add_terms(self, name: str, terms: List[str]) -> None:
+        frequencies = Counter(terms)
+        for term, frequency in frequencies.items():
+            self._postings.setdefault(term, {})[name] = frequency
+        self._terms[name] = tuple(frequencies)
+        self._lengths[name] = len(terms)
+        self._total_length += len(terms)
+        self._term_weights.clear()
+
+    def _remove(self, name: str) -> None:
+        length = self._lengths.pop(name, None)
+        if length is None:
+            return
+        self._total_length -= length
+        self._term_weights.clear()
+        self._indexed.pop(name, None)
+        for term in self._terms.pop(name):
+            postings = self._postings[term]
+            del postings[name]
+            if not postings:
+                del self._postings[term]
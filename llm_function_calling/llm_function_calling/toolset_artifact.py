@@ -0,0 +1,145 @@
+import json
+import mmap
+from typing import Dict, List, Optional
+
+from .function_call import FunctionCall
+from .function_calling_grammar_generator import generate_gbnf_grammar, append_primitive_grammar, \
+    generate_documentation, GRAMMAR_FORMAT_VERSION
+from .grammar_cache import atomic_write, fingerprint_function_calls
+
+ARTIFACT_MAGIC = b"LLMFC-TOOLSET\n"
+ARTIFACT_VERSION = 1
+
+
+def write_toolset_artifact(file_path: str, function_calls: List[FunctionCall], **grammar_options) -> str:
+    """
+    Write a precompiled toolset artifact for function_calls and return its schema fingerprint.
+
+    The file starts with a magic line and a one-line JSON header holding the artifact version, the schema
+    fingerprint, the grammar options and the offset and length of every section. The sections follow as
+    raw UTF-8: the grammar with primitive rules, the documentation and the function names.
+    """
+    fingerprint = fingerprint_function_calls(function_calls)
+    sections = {
+        "grammar": append_primitive_grammar(generate_gbnf_grammar(function_calls, **grammar_options)),
+        "documentation": generate_documentation(function_calls),
+        "function_names": json.dumps([function_call.name for function_call in function_calls]),
+    }
+
+    encoded = {name: content.encode("utf-8") for name, content in sections.items()}
+    offsets = {}
+    position = 0
+    for name, content in encoded.items():
+        offsets[name] = [position, len(content)]
+        position += len(content)
+    header = {
+        "artifact_version": ARTIFACT_VERSION,
+        "grammar_format_version": GRAMMAR_FORMAT_VERSION,
+        "fingerprint": fingerprint,
+        "grammar_options": grammar_options,
+        "sections": offsets,
+    }
+
+    with atomic_write(file_path, 'wb') as file:
+        file.write(ARTIFACT_MAGIC)
+        file.write(json.dumps(header, separators=(",", ":")).encode("utf-8") + b"\n")
+        for content in encoded.values():
+            file.write(content)
+    return fingerprint
+
+
+class ToolsetArtifact:
+    """
+    Read-only view of a toolset artifact. Only the header is parsed on open; the file is memory-mapped
+    and a section is decoded the first time it is accessed, so a worker only pays for what it uses.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._sections: Dict[str, str] = {}
+        with open(file_path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if self._mmap[:len(ARTIFACT_MAGIC)] != ARTIFACT_MAGIC:
+                raise ValueError(f"{file_path} is not a toolset artifact")
+            header_end = self._mmap.find(b"\n", len(ARTIFACT_MAGIC))
+            if header_end < 0:
+                raise ValueError(f"{file_path} has a truncated header")
+            header = json.loads(self._mmap[len(ARTIFACT_MAGIC):header_end].decode("utf-8"))
+            self.artifact_version: int = header["artifact_version"]
+            self.grammar_format_version: int = header["grammar_format_version"]
+            self.fingerprint: str = header["fingerprint"]
+            self.grammar_options: dict = header["grammar_options"]
+            self.section_offsets: Dict[str, List[int]] = header["sections"]
+            self._data_start = header_end + 1
+            # Check the sections against the file size now, so a truncated artifact is rebuilt on load
+            # instead of failing on first access
+            data_end = max((offset + length for offset, length in self.section_offsets.values()), default=0)
+            if self._data_start + data_end > len(self._mmap):
+                raise ValueError(f"{file_path} is truncated")
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def read_section(self, name: str) -> str:
+        content = self._sections.get(name)
+        if content is None:
+            if name not in self.section_offsets:
+                raise KeyError(f"Artifact has no section named {name!r}")
+            offset, length = self.section_offsets[name]
+            start = self._data_start + offset
+            if start + length > len(self._mmap):
+                raise ValueError(f"{self.file_path} is truncated")
+            content = self._mmap[start:start + length].decode("utf-8")
+            self._sections[name] = content
+        return content
+
+    @property
+    def grammar(self) -> str:
+        return self.read_section("grammar")
+
+    @property
+    def documentation(self) -> str:
+        return self.read_section("documentation")
+
+    @property
+    def function_names(self) -> List[str]:
+        return json.loads(self.read_section("function_names"))
+
+    def is_current(self, function_calls: List[FunctionCall], fingerprint: Optional[str] = None,
+                   **grammar_options) -> bool:
+        """Check the artifact against the live definitions, generator format and grammar options."""
+        if fingerprint is None:
+            fingerprint = fingerprint_function_calls(function_calls)
+        return (self.artifact_version == ARTIFACT_VERSION
+                and self.grammar_format_version == GRAMMAR_FORMAT_VERSION
+                and self.fingerprint == fingerprint
+                and self.grammar_options == grammar_options)
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def load_toolset_artifact(file_path: str, function_calls: List[FunctionCall], **grammar_options) -> ToolsetArtifact:
+    """
+    Open the artifact at file_path, rebuilding it first if it is missing, unreadable or stale,
+    i.e. if its fingerprint does not match the live FunctionCall definitions.
+    """
+    fingerprint = fingerprint_function_calls(function_calls)
+    try:
+        artifact = ToolsetArtifact(file_path)
+    except (OSError, ValueError, KeyError):
+        artifact = None
+    if artifact is not None:
+        if artifact.is_current(function_calls, fingerprint, **grammar_options):
+            return artifact
+        artifact.close()
+
+    write_toolset_artifact(file_path, function_calls, **grammar_options)
+    return ToolsetArtifact(file_path)